@@ -0,0 +1,205 @@
+# Monte Carlo balancing runner: plays many headless rounds in parallel with
+# scripted or random agents over a grid of config values, and prints summary
+# tables of score, survival time, fish stolen and power-up uptime.
+#
+#   python Balance.py --games 200 --grid DOG_COUNT=4,6,8 --grid MEOW_COOLDOWN_S=4,6
+#   python Balance.py --policy greedy random --grid DOG_STEAL_INTERVAL_S=0.6:1.5,1.0:2.5
+#   python Balance.py --grid FISH_PROB_GOLD=0.03,0.1 --json sweep.json
+#
+# Any Simulation TUNABLES name can be swept; tuple values are written a:b.
+# Each round is seeded (seed, seed + 1, ...), so a sweep can be re-run exactly.
+import sys, os, time, json, random, argparse, itertools, statistics
+from ast import literal_eval
+from multiprocessing import Pool
+import numpy as np
+import Simulation as S
+
+BALANCE_MAX_SECONDS = 180.0  # a round that survives this long is cut off
+BALANCE_ACT_INTERVAL_S = 0.15  # agents press one key at most this often
+BALANCE_GAMES = 100  # rounds per (config, policy) cell
+
+
+# Agent policies: act(state) returns the actions for this tick.
+
+class IdlePolicy:
+    """Never presses anything; a baseline for how fast dogs end a round."""
+    def __init__(self, rng): pass
+    def act(self, state): return ()
+
+
+class RandomPolicy:
+    """Mashes random gameplay keys."""
+    ACTIONS = ("forward", "backward", "left", "right", "jump", "meow", "decoy")
+    def __init__(self, rng): self.rng = rng
+    def act(self, state): return (self.rng.choice(self.ACTIONS),)
+
+
+def fish_positions(field):
+    if hasattr(field, "fishes"):
+        live = [(f.x, f.y) for f in field.fishes if f.alive]
+        return np.array(live).reshape(-1, 2)
+    return np.column_stack((field.x[field.alive], field.y[field.alive]))
+
+
+def dog_positions(pack):
+    if hasattr(pack, "dogs"): return np.array([(d.x, d.y) for d in pack.dogs]).reshape(-1, 2)
+    return np.column_stack((pack.x, pack.y))
+
+
+class GreedyPolicy:
+    """Heads for the nearest fish, meows when dogs close in and drops a decoy
+    while the meow is cooling down; jumps to widen pickup when a fish is in
+    the cat's cell but out of reach."""
+    def __init__(self, rng): self.rng = rng
+
+    def act(self, state):
+        cat = state.cat
+        dogs = dog_positions(state.dogs)
+        if len(dogs):
+            near = np.hypot(dogs[:, 0] - cat.x, dogs[:, 1] - cat.y).min()
+            if near < S.MEOW_RANGE * 0.8 and state.meow_ready(): return ("meow",)
+            if near < (S.DOG_RADIUS + S.CAT_BODY_R) * 1.5 and not state.decoy_active(): return ("decoy",)
+        fish = fish_positions(state.fish_field)
+        if not len(fish): return ()
+        dx, dy = (fish - (cat.x, cat.y)).T
+        k = int(np.argmin(dx * dx + dy * dy))
+        dx, dy = dx[k], dy[k]
+        half = S.CELL_SIZE * 0.5
+        if abs(dx) <= half and abs(dy) <= half: return ("jump",)
+        want = (0.0 if dx > 0 else 180.0) if abs(dx) > abs(dy) else (90.0 if dy > 0 else 270.0)
+        turn = (want - cat.yaw_deg) % 360.0
+        if turn == 0.0: return ("forward",)
+        return ("right",) if turn == 270.0 else ("left",)
+
+
+POLICIES = {"idle": IdlePolicy, "random": RandomPolicy, "greedy": GreedyPolicy}
+
+
+def play(overrides, policy, seed, max_seconds=BALANCE_MAX_SECONDS):
+    """One headless round under `overrides` (TUNABLES name -> value) with the
+    named policy; returns its stats."""
+    S.apply_config(overrides)
+    state = S.GameState(S.GameClock(), seed=seed)
+    agent = POLICIES[policy](random.Random(seed))
+    dt = S.SIM_DT
+    act_every = max(1, round(BALANCE_ACT_INTERVAL_S / dt))
+    max_ticks = int(max_seconds / dt)
+    powered = 0
+    for tick in range(max_ticks):
+        state.step(dt, agent.act(state) if tick % act_every == 0 else ())
+        if state.game_over: break
+        now = state.clock.now
+        if now < state.score_x10_until or now < state.double_score_until or now < state.speed_boost_until:
+            powered += 1
+    survived = state.clock.now
+    return {"score": state.score, "survival_s": survived, "survived": not state.game_over,
+            "fish_stolen": state.fish_stolen, "powerup_uptime": powered * dt / max(survived, dt)}
+
+
+# Worker processes start from the module defaults and apply each task's overrides on top.
+_defaults = None
+
+def _init_worker():
+    global _defaults
+    _defaults = S.config_snapshot()
+    sys.stdout = open(os.devnull, "w")  # the simulation prints gameplay messages
+
+def _run_task(task):
+    key, overrides, policy, seed, max_seconds = task
+    S.apply_config(_defaults)
+    return key, play(overrides, policy, seed, max_seconds)
+
+
+def parse_grid(specs):
+    """["DOG_COUNT=4,6", "DOG_STEAL_INTERVAL_S=0.6:1.5,1:2"] -> {name: [values]}"""
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name not in S.TUNABLES: raise SystemExit(f"{name} is not a Simulation tunable")
+        parsed = []
+        for v in values.split(","):
+            if ":" in v: parsed.append(tuple(literal_eval(x) for x in v.split(":")))
+            else:
+                try: parsed.append(literal_eval(v))
+                except (ValueError, SyntaxError): parsed.append(v)  # bare strings, e.g. FISH_BACKEND
+        grid[name] = parsed
+    return grid
+
+
+def configs(grid):
+    """Every combination of the grid values as an overrides dict."""
+    names = list(grid)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(grid[n] for n in names))]
+
+
+def label(overrides):
+    if not overrides: return "defaults"
+    return " ".join(f"{k}={':'.join(map(str, v)) if isinstance(v, tuple) else v}" for k, v in overrides.items())
+
+
+def summarize(rounds):
+    """Aggregate stats for one (config, policy) cell."""
+    col = lambda k: [r[k] for r in rounds]
+    score = col("score")
+    return {"games": len(rounds),
+            "score_mean": statistics.fmean(score), "score_sd": statistics.pstdev(score),
+            "score_p50": statistics.median(score), "score_max": max(score),
+            "survival_mean_s": statistics.fmean(col("survival_s")),
+            "survived_frac": statistics.fmean(col("survived")),
+            "fish_stolen_mean": statistics.fmean(col("fish_stolen")),
+            "powerup_uptime": statistics.fmean(col("powerup_uptime"))}
+
+
+def sweep(grid, policies, games, seed=0, max_seconds=BALANCE_MAX_SECONDS, processes=None):
+    """Plays `games` rounds per config x policy on a process pool; returns
+    {(config label, policy): summary}, in grid order."""
+    cells = [(label(cfg), cfg, p) for cfg in configs(grid) for p in policies]
+    tasks = [((name, p), cfg, p, seed + g, max_seconds) for name, cfg, p in cells for g in range(games)]
+    rounds = {(name, p): [] for name, _, p in cells}
+    with Pool(processes, initializer=_init_worker) as pool:
+        chunk = max(1, len(tasks) // ((processes or os.cpu_count() or 1) * 8))
+        for done, (key, stats) in enumerate(pool.imap_unordered(_run_task, tasks, chunk), 1):
+            rounds[key].append(stats)
+            if done % max(1, len(tasks) // 20) == 0 or done == len(tasks):
+                print(f"\r{done}/{len(tasks)} rounds", end="", file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+    return {key: summarize(r) for key, r in rounds.items()}
+
+
+def print_table(summary):
+    width = max([len(name) for name, _ in summary] + [6])
+    print(f"{'config':{width}s} {'policy':8s} {'games':>5s} {'score':>13s} {'p50':>6s} {'max':>5s} "
+          f"{'survival':>9s} {'alive':>6s} {'stolen':>7s} {'powerup':>8s}")
+    for (name, policy), s in summary.items():
+        print(f"{name:{width}s} {policy:8s} {s['games']:5d} {s['score_mean']:7.1f} ±{s['score_sd']:5.1f} "
+              f"{s['score_p50']:6.1f} {s['score_max']:5d} {s['survival_mean_s']:8.1f}s {s['survived_frac']:6.0%} "
+              f"{s['fish_stolen_mean']:7.1f} {s['powerup_uptime']:8.1%}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Meowgic Catch balancing sweeps")
+    ap.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2",
+                    help="a tunable and the values to try; repeat for more axes")
+    ap.add_argument("--policy", nargs="+", default=["greedy"], choices=sorted(POLICIES))
+    ap.add_argument("--games", type=int, default=BALANCE_GAMES, help="rounds per config and policy")
+    ap.add_argument("--seed", type=int, default=0, help="seed of the first round")
+    ap.add_argument("--max-seconds", type=float, default=BALANCE_MAX_SECONDS, help="simulated round length cap")
+    ap.add_argument("--processes", type=int, help="worker processes (default: all cores)")
+    ap.add_argument("--json", help="also write the summary table here")
+    args = ap.parse_args(argv)
+
+    grid = parse_grid(args.grid)
+    t = time.perf_counter()
+    summary = sweep(grid, args.policy, args.games, args.seed, args.max_seconds, args.processes)
+    elapsed = time.perf_counter() - t
+    print_table(summary)
+    n = len(summary) * args.games
+    print(f"\n{n} rounds in {elapsed:.1f}s ({n / elapsed:.1f} rounds/s)")
+    if args.json:
+        rows = [{"config": name, "policy": policy, **s} for (name, policy), s in summary.items()]
+        with open(args.json, "w") as f: json.dump({"grid": {k: list(v) for k, v in grid.items()}, "rows": rows}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+# Benchmark suite for Meowgic Catch: hot functions plus scaled scenarios.
+#
+#   python Benchmark.py                          run everything, write bench.json
+#   python Benchmark.py -k fish                  only benchmarks whose name contains "fish"
+#   python Benchmark.py --baseline base.json     compare, exit 1 on a regression
+#   python Benchmark.py --save-baseline base.json
+#
+# The simulation benchmarks are headless. The rendering ones (names starting
+# with "gl.") need an OpenGL context: the current one, a hidden GLUT window,
+# or an off-screen EGL context (Offscreen.py) when there is no display;
+# otherwise they are reported as skipped.
+import sys, os, time, json, random, platform, argparse, statistics, contextlib
+
+# the off-screen fallback needs the EGL platform, chosen before OpenGL is imported
+if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+    os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+import numpy as np
+import Simulation as S
+
+BENCH_ROUND_SEC = 0.05   # each timed round runs at least this long
+BENCH_ROUNDS = 7
+REGRESSION_TOLERANCE = 0.15  # flag when median time grows by more than 15%
+
+BENCHMARKS = {}  # name -> setup(); setup returns the callable to time
+
+
+def bench(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def new_state(fish=None, dogs=None, backend=None, seed=0):
+    """A seeded GameState on a virtual clock, optionally with another fish/dog
+    backend ("objects" or "numpy") and fish/dog counts."""
+    saved = S.FISH_BACKEND, S.DOG_BACKEND
+    if backend: S.FISH_BACKEND = S.DOG_BACKEND = backend
+    try:
+        state = S.GameState(S.GameClock(), seed=seed)
+    finally:
+        S.FISH_BACKEND, S.DOG_BACKEND = saved
+    random.seed(seed)  # query points drawn by the benchmarks themselves
+    if fish is not None: state.fish_field.spawn_random(fish)
+    if dogs is not None: state.dogs.ensure_count(dogs)
+    state.lives = 10 ** 9  # never end the round mid-benchmark
+    return state
+
+
+# Simulation micro benchmarks
+
+def _fish_setup(backend, n, op):
+    def setup():
+        field = new_state(fish=n, backend=backend).fish_field
+        if op == "collect_and_report":
+            def run():
+                field.collect_and_report(random.uniform(-400, 400), random.uniform(-400, 400), S.FISH_PICKUP_RADIUS)
+                if field.remaining() < n // 2: field.spawn_random(n)
+        elif op == "magnet_pull":
+            def run(): field.magnet_pull(0.0, 0.0, S.CHEAT_BUBBLE_RADIUS, S.CHEAT_MAGNET_SPEED, S.SIM_DT)
+        else:
+            def run():
+                field.clock.advance(S.SIM_DT); field.update(S.SIM_DT)
+        return run
+    return setup
+
+for _backend in ("objects", "numpy"):
+    for _op in ("collect_and_report", "magnet_pull"):
+        bench(f"fish.{_backend}.{_op}")(_fish_setup(_backend, S.FISH_COUNT, _op))
+    for _n in (1000, 10000, 100000):
+        bench(f"fish.{_backend}.update.{_n}")(_fish_setup(_backend, _n, "update"))
+        bench(f"fish.{_backend}.collect_and_report.{_n}")(_fish_setup(_backend, _n, "collect_and_report"))
+
+
+def _dog_setup(backend, n, op):
+    def setup():
+        pack = new_state(dogs=n, backend=backend).dogs
+        if op == "separate":
+            def run(): pack.separate(S.SIM_DT)
+        else:
+            def run():
+                pack.clock.advance(S.SIM_DT); pack.update(S.SIM_DT, (0.0, 0.0)); pack.separate(S.SIM_DT)
+        return run
+    return setup
+
+for _backend in ("objects", "numpy"):
+    for _n in (10, 100, 1000):
+        bench(f"dogs.{_backend}.separate.{_n}")(_dog_setup(_backend, _n, "separate"))
+        bench(f"dogs.{_backend}.tick.{_n}")(_dog_setup(_backend, _n, "tick"))
+
+
+def _tick_setup(backend, fish, dogs):
+    def setup():
+        state = new_state(fish=fish, dogs=dogs, backend=backend)
+        inputs = ("forward", "left", "forward", "meow", "right", "forward", "decoy", "jump")
+        k = [0]
+        def run():
+            state.step(S.SIM_DT, (inputs[k[0] % len(inputs)],))
+            k[0] += 1
+        return run
+    return setup
+
+bench("tick.default")(_tick_setup("objects", None, None))
+for _backend in ("objects", "numpy"):
+    for _fish, _dogs in ((1000, 10), (10000, 100), (100000, 1000)):
+        bench(f"tick.{_backend}.{_fish}fish.{_dogs}dogs")(_tick_setup(_backend, _fish, _dogs))
+
+
+@bench("mesh.tessellate_sphere")
+def _tessellate():
+    import Game
+    return lambda: Game.tessellate_sphere(S.FISH_BODY_R, 16, 16)
+
+# Rendering benchmarks (need a GL context)
+
+@bench("gl.draw_sphere")
+def _draw_sphere():
+    import Game
+    return lambda: Game.draw_sphere(S.FISH_BODY_R, 16, 16)
+
+@bench("gl.world_draw")
+def _world_draw():
+    import Game
+    world = S.World(S.GameClock())
+    world.weather = "rain"
+    def run():
+        Game.world_view.update(world, S.SIM_DT)
+        Game.world_view.draw(world)
+    return run
+
+@bench("gl.frame")
+def _frame():
+    import Game
+    Game.clock = S.GameClock()
+    Game.state = new_state()
+    Game.stepper = S.FixedStepper(Game.state)
+    def run():
+        Game.stepper.advance(S.SIM_DT, Game.pending_inputs)
+        Game.display()
+    return run
+
+
+_gl_ready = None
+
+def gl_available():
+    """True if a GL context is current, or a hidden GLUT window or an
+    off-screen context could be made."""
+    global _gl_ready
+    if _gl_ready is not None: return _gl_ready
+    import Game
+    try:
+        _gl_ready = bool(Game.glGetString(Game.GL_VERSION))
+    except Exception:
+        _gl_ready = False
+    if not _gl_ready and (os.environ.get("DISPLAY") or not sys.platform.startswith("linux")):
+        try:
+            Game.glutInit(sys.argv)
+            Game.glutInitDisplayMode(Game.GLUT_DOUBLE | Game.GLUT_RGB | Game.GLUT_DEPTH)
+            Game.glutInitWindowSize(Game.WINDOW_WIDTH, Game.WINDOW_HEIGHT)
+            Game.glutCreateWindow(b"Meowgic Catch benchmark")
+            Game.glutHideWindow()
+            _gl_ready = True
+        except Exception:
+            _gl_ready = False
+    if _gl_ready:
+        Game.init_gl()
+        return True
+    try:
+        import Offscreen
+        Offscreen.start()
+        _gl_ready = True
+    except Exception:
+        _gl_ready = False
+    return _gl_ready
+
+
+def measure(run):
+    """Per-call seconds over BENCH_ROUNDS rounds, timeit-style autoranging."""
+    loops = 1
+    while True:
+        t = time.perf_counter()
+        for _ in range(loops): run()
+        if time.perf_counter() - t >= BENCH_ROUND_SEC or loops >= 1 << 20: break
+        loops *= 2
+    samples = []
+    for _ in range(BENCH_ROUNDS):
+        t = time.perf_counter()
+        for _ in range(loops): run()
+        samples.append((time.perf_counter() - t) / loops)
+    return {"median": statistics.median(samples), "min": min(samples), "loops": loops}
+
+
+def run_benchmarks(pattern=""):
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if pattern not in name: continue
+        if name.startswith("gl.") and not gl_available():
+            results[name] = {"skipped": "no GL context"}
+            print(f"{name:45s}   skipped (no GL context)")
+            continue
+        # the simulation prints gameplay messages; keep them out of the report
+        with open(os.devnull, "w") as quiet, contextlib.redirect_stdout(quiet):
+            results[name] = measure(setup())
+        print(f"{name:45s} {fmt(results[name]['median'])}", flush=True)
+    return results
+
+
+def fmt(sec):
+    if sec < 1e-3: return f"{sec * 1e6:9.1f} us"
+    return f"{sec * 1e3:9.2f} ms"
+
+
+def compare(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """Print current vs baseline medians; return the names that regressed."""
+    regressed = []
+    print(f"\n{'benchmark':45s} {'baseline':>12s} {'current':>12s}   ratio")
+    for name, r in results.items():
+        b = baseline.get(name)
+        if "median" not in r or not b or "median" not in b: continue
+        ratio = r["median"] / b["median"]
+        flag = ""
+        if ratio > 1.0 + tolerance:
+            flag = "  REGRESSION"; regressed.append(name)
+        print(f"{name:45s} {fmt(b['median'])}  {fmt(r['median'])}   {ratio:5.2f}{flag}")
+    return regressed
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Meowgic Catch benchmarks")
+    ap.add_argument("-k", "--filter", default="", help="only run benchmarks containing this text")
+    ap.add_argument("--out", default="bench.json", help="where to write the JSON results")
+    ap.add_argument("--baseline", help="JSON results to compare against")
+    ap.add_argument("--save-baseline", help="also write the results here as the new baseline")
+    ap.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    args = ap.parse_args(argv)
+
+    results = run_benchmarks(args.filter)
+    doc = {"meta": {"python": platform.python_version(), "numpy": np.__version__,
+                    "machine": platform.platform(), "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+           "results": results}
+    for path in (args.out, args.save_baseline):
+        if path:
+            with open(path, "w") as f: json.dump(doc, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f: baseline = json.load(f)["results"]
+        regressed = compare(results, baseline, args.tolerance)
+        if regressed:
+            print(f"\n{len(regressed)} regression(s) beyond {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
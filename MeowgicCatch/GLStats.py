@@ -0,0 +1,132 @@
+# Opt-in GL call accounting: wraps the gl*/glu*/glut* functions a module
+# calls through its globals and counts, per frame and per labelled section,
+# how many calls, draw submissions, vertices and state changes were issued.
+import re
+
+GL_FUNC = re.compile(r"^(gl|glu|glut)[A-Z]")
+STATE_FUNCS = re.compile(r"^gl(Color|Enable|Disable|Bind|UseProgram|Uniform|LineWidth|PointSize|ClearColor|Fog"
+                         r"|PolygonMode|BlendFunc|DepthMask|MatrixMode|ShadeModel|CullFace"
+                         r"|VertexPointer|ColorPointer|VertexAttribPointer|VertexAttribDivisor)")
+VERTEX_FUNCS = re.compile(r"^glVertex[234]")
+COUNTERS = ("calls", "draws", "vertices", "state")
+
+
+class _Section:
+    __slots__ = ("stats", "name", "prev")
+    def __init__(self, stats, name):
+        self.stats, self.name = stats, name
+    def __enter__(self):
+        self.prev = self.stats.label; self.stats._select(self.name)
+    def __exit__(self, *exc):
+        self.stats._select(self.prev)
+
+
+class _NoSection:
+    def __enter__(self): pass
+    def __exit__(self, *exc): pass
+
+_NO_SECTION = _NoSection()
+
+
+class GLStats:
+    """Counts GL work per section while installed.
+
+    install(namespace) swaps every GL function in `namespace` (e.g. a module's
+    globals()) for a counting wrapper; uninstall() puts the originals back.
+    `with stats.section("Fish"):` attributes the calls inside to "Fish";
+    end_frame() publishes the frame's counts in `last` and starts a new frame.
+    Vertices inside a display list are counted when the list is compiled while
+    installed, then charged to every glCallList of it.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.originals = {}
+        self.list_vertices = {}
+        self.compiling = None
+        self.frame = {}
+        self.last = {}
+        self.label = "Other"
+        self._select("Other")
+
+    def _select(self, name):
+        self.label = name
+        c = self.frame.get(name)
+        if c is None: c = self.frame[name] = [0, 0, 0, 0]
+        self.cur = c
+
+    def section(self, name):
+        return _Section(self, name) if self.enabled else _NO_SECTION
+
+    def end_frame(self):
+        if not self.enabled: return
+        self.last = {k: dict(zip(COUNTERS, v)) for k, v in self.frame.items() if v[0]}
+        self.frame = {}
+        self._select(self.label)
+
+    def totals(self, counts=None):
+        counts = self.last if counts is None else counts
+        return {c: sum(v[c] for v in counts.values()) for c in COUNTERS}
+
+    def _add_vertices(self, n):
+        if self.compiling is None: self.cur[2] += n
+        else: self.list_vertices[self.compiling] += n
+
+    # Wrappers
+
+    def _wrap(self, name, fn):
+        stats = self
+        if VERTEX_FUNCS.match(name):
+            def counted(*a):
+                stats.cur[0] += 1; stats._add_vertices(1)
+                return fn(*a)
+        elif name in ("glDrawArrays", "glDrawElements", "glDrawElementsInstanced", "glDrawArraysInstanced"):
+            count_arg = 2 if name.startswith("glDrawArrays") else 1
+            def counted(*a):
+                c = stats.cur; c[0] += 1; c[1] += 1
+                stats._add_vertices(int(a[count_arg]) * (int(a[-1]) if name.endswith("Instanced") else 1))
+                return fn(*a)
+        elif name in ("glBegin", "glCallLists", "glutBitmapCharacter"):
+            def counted(*a):
+                c = stats.cur; c[0] += 1; c[1] += 1
+                return fn(*a)
+        elif name == "glCallList":
+            def counted(list_id):
+                c = stats.cur; c[0] += 1; c[1] += 1
+                stats._add_vertices(stats.list_vertices.get(int(list_id), 0))
+                return fn(list_id)
+        elif name == "glNewList":
+            def counted(list_id, mode):
+                stats.cur[0] += 1
+                stats.compiling = int(list_id); stats.list_vertices[stats.compiling] = 0
+                return fn(list_id, mode)
+        elif name == "glEndList":
+            def counted():
+                stats.cur[0] += 1; stats.compiling = None
+                return fn()
+        elif STATE_FUNCS.match(name):
+            def counted(*a):
+                c = stats.cur; c[0] += 1; c[3] += 1
+                return fn(*a)
+        else:
+            def counted(*a):
+                stats.cur[0] += 1
+                return fn(*a)
+        counted.__name__ = name
+        return counted
+
+    def install(self, namespace):
+        if self.enabled: return
+        for name, fn in list(namespace.items()):
+            if GL_FUNC.match(name) and callable(fn) and not isinstance(fn, type):
+                self.originals[name] = fn
+                namespace[name] = self._wrap(name, fn)
+        self.namespace = namespace
+        self.enabled = True
+        self.frame = {}; self.last = {}
+        self._select("Other")
+
+    def uninstall(self):
+        if not self.enabled: return
+        self.namespace.update(self.originals)
+        self.originals = {}
+        self.enabled = False
@@ -1,8 +1,16 @@
-import sys, time, math, random
+import sys, time, math, ctypes, weakref, argparse, atexit
+from collections import OrderedDict
+import numpy as np
 from math import sin, cos, radians
 from OpenGL.GL import *
 from OpenGL.GLU import *
 from OpenGL.GLUT import *
+import Simulation as S
+from Simulation import (GameClock, GameState, FixedStepper, ArrayFishField, ArrayDogPack,
+                        FISH_KINDS, grid_half_cells)
+from Profiler import Profiler
+from GLStats import GLStats
+from Replay import Recorder
 
 #CONFIG 
 WINDOW_TITLE = "Meowgic Catch — OpenGL MVP"
@@ -14,18 +22,10 @@ Z_NEAR = 0.1
 Z_FAR = 2000.0
 
 #Dynamic Environment: grid/floor visuals used by time-of-day
-CELL_SIZE = 60.0
-GRID_HALF_CELLS = 8
 SHOW_AXES = True
 SHOW_GRID_LINES = True
 
-# Cat & Dog collision
-COLLISION_HEIGHT_TOL = 25.0
-HIT_IFRAMES_SEC = 0.6
-
-
 # Dynamic Environment: phases of day
-TIME_OF_DAY_DURATION_SEC = 30.0
 COLOR_MORNING_SKY = (0.65, 0.80, 1.00)
 COLOR_AFTERNOON_SKY = (0.40, 0.70, 1.00)
 COLOR_EVENING_SKY = (0.05, 0.05, 0.10)
@@ -40,8 +40,7 @@ CAM_YAW_DEG = 35.0
 CAM_PITCH_DEG = 45.0
 
 
-# Cat [Player Body, Player Movement/Jump visuals]
-CAT_BODY_R = 40.0
+# Cat [Player Body visuals]
 CAT_HEAD_R = 22.0
 CAT_EAR_R = 6.0
 CAT_EAR_H = 14.0
@@ -49,218 +48,438 @@ CAT_LEG_W = 8.0
 CAT_LEG_H = 14.0
 CAT_TAIL_R = 4.0
 CAT_TAIL_L = 35.0
-CAT_Z_OFFSET = 30.0
 CAT_COLOR_BODY = (0.90, 0.70, 0.25)
 CAT_COLOR_HEAD = (0.95, 0.80, 0.40)
 CAT_COLOR_EAR = (0.85, 0.55, 0.25)
 CAT_COLOR_LEG = (0.45, 0.30, 0.20)
 CAT_COLOR_TAIL = (0.45, 0.30, 0.20)
 
-
-#  Cat jump parameters [Jump Action]
-CAT_JUMP_HEIGHT = 80.0
-CAT_JUMP_DURATION = 0.6
-CAT_JUMP_COOLDOWN = 0.2
-
-#Fish (random spawn + behaviors/scoring types)
-FISH_COUNT = 17
-FISH_BODY_R = 12.0
+#Fish visuals
 FISH_TAIL_R = 6.0
 FISH_TAIL_L = 14.0
-FISH_PICKUP_RADIUS = 36.0
-FISH_Z = 25.0
 FISH_COLOR_BODY = (0.20, 0.75, 0.95)
 FISH_COLOR_TAIL = (0.95, 0.65, 0.25)
 
-# spawn weights
-FISH_PROB_NORMAL = 0.55
-FISH_PROB_FAST = 0.25
-FISH_PROB_TIMED = 0.17
-FISH_PROB_GOLD = 0.03
-
-
-FISH_FAST_SPEED = 220.0
-FISH_TIMED_TTL_S = (4.0, 7.0)
-
-# Powerups & scoring
-POWERUP_TIME_S = 10.0
-POWERUP_SPEED_MULT = 1.6
-SCORE_NORMAL = 1
-SCORE_FAST = 2
-SCORE_TIMED = 2
-SCORE_GOLD = 3
-
-# Dogs (antagonist) and their health & steal mechanics
-DOG_RADIUS = 20.0
-DOG_SPEED = 70.0
+# Dogs
 DOG_COLOR = (0.36, 0.25, 0.20)
-START_LIVES = 5
-
-DOG_COUNT = 6
-DOG_STEAL_INTERVAL_S = (0.6, 1.5)
-DOG_STEAL_RADIUS_MULT = 0.8
+DOG_STUN_COLOR = (0.45, 0.55, 0.95)
+OBSTACLE_COLOR = (0.45, 0.42, 0.38)
 
 # Different fish type colors for body and tail
 FISH_COLOR_NORMAL = (1.20, 1.60, 1.95)
 FISH_COLOR_FAST = (1.10, 1.85, 1.55)
 FISH_COLOR_TIMED = (2.00, 1.30, 2.30)
 FISH_COLOR_GOLD = (1.00, 2.80, 3.20)
-
-# Meow stun 
-MEOW_RANGE = 140.0
-MEOW_STUN_SEC = 2.0
-MEOW_COOLDOWN_S = 6.0
+FISH_BODY_COLORS = {"normal": FISH_COLOR_BODY, "fast": FISH_COLOR_BODY,
+                    "timed": FISH_COLOR_BODY, "gold": FISH_COLOR_GOLD}
+FISH_TAIL_COLORS = {"normal": FISH_COLOR_TAIL, "fast": FISH_COLOR_TAIL,
+                    "timed": FISH_COLOR_TAIL, "gold": FISH_COLOR_GOLD}
 
 # Decoy 
-DECOY_LIFETIME = 5.0
-DECOY_RADIUS = 10.0
 DECOY_COLOR = (0.6, 0.9, 0.3)
 
-#Cheat Bubble Mode (auto-collect nearby Cat while in cheat mode)
-CHEAT_BUBBLE_RADIUS = 120.0
-CHEAT_MAGNET_SPEED  = 240.0
+#Cheat Bubble Mode visuals
 CHEAT_BUBBLE_COLOR  = (0.95, 0.97, 1.00)
 CHEAT_BUBBLE_LINEW  = 2.0
-cheat_mode = False
+
+# Particles (rain + ring bursts for meow / decoy)
+RAIN_DROPS = 160
+RAIN_SPEED = 720.0
+RAIN_STREAK = 14.0
+RAIN_COLOR = (0.85, 0.90, 0.95)
+RAIN_AREA_HALF = 1200.0  # rain falls within this half-width of the camera target (capped at the arena)
+EFFECT_CAPACITY = 2048
+EFFECT_RING_LIFE = 0.35
+MEOW_RING_COLOR = (1.0, 0.95, 0.5)
+
+# Game speed: 1.0 is real time, 2.0 / 10.0 fast-forward the whole simulation
+TIME_SCALE = 1.0
+
+# Frame pacing: frames are scheduled with glutTimerFunc at TARGET_FPS (0 = as
+# fast as possible) instead of a busy idle loop, and stop while paused or on the
+# game over screen until a key is pressed. VSYNC asks the driver to sync swaps
+# to the display refresh where it allows it.
+TARGET_FPS = 60
+VSYNC = True
+
+# Draw all fish / all dogs with one instanced call each when the context
+# supports GL 3.3 instancing (llvmpipe does); otherwise fall back to models.
+BATCH_RENDERING = True
+
+# Level of detail from projected size: a creature whose bounding sphere covers at
+# least LOD_THRESHOLDS_PX[i] pixels (diameter) uses LOD i, smaller ones the last
+# LOD. Each LOD scales sphere/cone/cylinder segments by LOD_SEGMENT_SCALE, and
+# from LOD_DROP_DETAIL on, eyes, fins and noses are left out.
+LOD_ENABLED = True
+LOD_THRESHOLDS_PX = (90.0, 30.0)
+LOD_SEGMENT_SCALE = (1.0, 0.5, 0.25)
+LOD_DROP_DETAIL = 2
+LODS = range(len(LOD_SEGMENT_SCALE))
+CAT_BOUND_R = S.CAT_BODY_R * 2.0
+FISH_BOUND_R = 32.0
+DOG_BOUND_R = S.DOG_RADIUS * 2.4
+
+# Skip creatures, rain and floor chunks whose bounding sphere is outside the
+# view frustum; the floor is split into FLOOR_CHUNK_CELLS x FLOOR_CHUNK_CELLS chunks.
+CULLING_ENABLED = True
+FLOOR_CHUNK_CELLS = 4
+# Only chunks inside the camera's ground footprint are built; built chunk lists
+# beyond FLOOR_CHUNK_CACHE are evicted least recently drawn first.
+FLOOR_CHUNK_CACHE = 512
+# Keep the camera on the cat; None follows it only in large-world mode
+CAM_FOLLOW_CAT = None
+
+def cam_follows_cat():
+    return S.LARGE_WORLD if CAM_FOLLOW_CAT is None else CAM_FOLLOW_CAT
 
 # Primitive shapes like cylinder, sphere, cone, cube
-def draw_cylinder(base_radius, top_radius, height, slices, stacks):
-    # Drawing a cylinder using OpenGL functions (GL_QUADS for simplicity)
+# Each primitive is tessellated once per (shape, params) into packed vertex/index
+# arrays and drawn with vertex arrays, so per-frame cost no longer grows with the
+# number of slices/stacks. Tessellation stays GL-free; upload happens in Mesh.
+def tessellate_cylinder(base_radius, top_radius, height, slices, stacks):
+    verts, idx = [], []
     angle_step = 2.0 * math.pi / slices
     stack_step = height / stacks
 
-    # Draw the cylindrical side surface
+    # Cylindrical side surface (quads split into two triangles)
     for i in range(slices):
         theta0 = i * angle_step
         theta1 = (i + 1) * angle_step
-
         x0 = base_radius * math.cos(theta0)
         y0 = base_radius * math.sin(theta0)
         x1 = base_radius * math.cos(theta1)
         y1 = base_radius * math.sin(theta1)
-
-        glBegin(GL_QUADS)
         for j in range(stacks):
             z0 = j * stack_step
             z1 = (j + 1) * stack_step
-
-            glVertex3f(x0, y0, z0)
-            glVertex3f(x1, y1, z0)
-            glVertex3f(x1, y1, z1)
-            glVertex3f(x0, y0, z1)
-        glEnd()
-
-    # Draw the top and bottom circles
-    glBegin(GL_TRIANGLE_FAN)
-    glVertex3f(0, 0, height)  # Top center
+            n = len(verts) // 3
+            verts += (x0, y0, z0, x1, y1, z0, x1, y1, z1, x0, y0, z1)
+            idx += (n, n + 1, n + 2, n, n + 2, n + 3)
+
+    # Top and bottom caps (triangle fans)
+    for z, r in ((height, top_radius), (0.0, base_radius)):
+        center = len(verts) // 3
+        verts += (0.0, 0.0, z)
+        for i in range(slices + 1):
+            angle = i * angle_step
+            verts += (r * math.cos(angle), r * math.sin(angle), z)
+        for i in range(slices):
+            idx += (center, center + 1 + i, center + 2 + i)
+    return verts, idx
+
+def tessellate_sphere(radius, slices, stacks):
+    verts, idx = [], []
     for i in range(slices + 1):
-        angle = i * angle_step
-        x = top_radius * math.cos(angle)
-        y = top_radius * math.sin(angle)
-        glVertex3f(x, y, height)
-    glEnd()
-
-    glBegin(GL_TRIANGLE_FAN)
-    glVertex3f(0, 0, 0)  # Bottom center
-    for i in range(slices + 1):
-        angle = i * angle_step
-        x = base_radius * math.cos(angle)
-        y = base_radius * math.sin(angle)
-        glVertex3f(x, y, 0)
-    glEnd()
-
-def draw_sphere(radius, slices, stacks):
-    for i in range(slices):
-        lat0 = math.pi * (-0.5 + float(i) / slices)
-        lat1 = math.pi * (-0.5 + float(i + 1) / slices)
-
-        glBegin(GL_QUAD_STRIP)
+        lat = math.pi * (-0.5 + float(i) / slices)
         for j in range(stacks + 1):
             lng = 2 * math.pi * float(j) / stacks
-            x0 = cos(lng) * sin(lat0)
-            y0 = sin(lng) * sin(lat0)
-            z0 = cos(lat0)
-            x1 = cos(lng) * sin(lat1)
-            y1 = sin(lng) * sin(lat1)
-            z1 = cos(lat1)
-            glVertex3f(x0 * radius, y0 * radius, z0 * radius)
-            glVertex3f(x1 * radius, y1 * radius, z1 * radius)
-        glEnd()
+            verts += (cos(lng) * sin(lat) * radius, sin(lng) * sin(lat) * radius, cos(lat) * radius)
 
-def draw_cone(base_radius, height, slices, stacks):
+    # One quad strip per latitude band, emitted as triangle pairs
+    row = stacks + 1
+    for i in range(slices):
+        for j in range(stacks):
+            a = i * row + j; b = a + row
+            idx += (a, b, a + 1, a + 1, b, b + 1)
+    return verts, idx
+
+def tessellate_cone(base_radius, height, slices, stacks):
+    verts, idx = [], []
     angle_step = 2.0 * math.pi / slices
     stack_step = height / stacks
 
     for i in range(slices):
         angle0 = i * angle_step
         angle1 = (i + 1) * angle_step
-
         x0 = base_radius * cos(angle0)
         y0 = base_radius * sin(angle0)
         x1 = base_radius * cos(angle1)
         y1 = base_radius * sin(angle1)
-
-        glBegin(GL_TRIANGLES)
         for j in range(stacks):
             z0 = j * stack_step
             z1 = (j + 1) * stack_step
+            n = len(verts) // 3
+            verts += (x0, y0, z0, x1, y1, z0, 0.0, 0.0, z1)
+            idx += (n, n + 1, n + 2)
+    return verts, idx
+
+def tessellate_cube(size):
+    h = size / 2.0  # Half of the cube's size for easier vertex calculation
+    faces = (
+        ((-h, -h,  h), ( h, -h,  h), ( h,  h,  h), (-h,  h,  h)),  # Front
+        ((-h, -h, -h), (-h,  h, -h), ( h,  h, -h), ( h, -h, -h)),  # Back
+        ((-h, -h, -h), (-h, -h,  h), (-h,  h,  h), (-h,  h, -h)),  # Left
+        (( h, -h, -h), ( h,  h, -h), ( h,  h,  h), ( h, -h,  h)),  # Right
+        ((-h,  h, -h), (-h,  h,  h), ( h,  h,  h), ( h,  h, -h)),  # Top
+        ((-h, -h, -h), ( h, -h, -h), ( h, -h,  h), (-h, -h,  h)),  # Bottom
+    )
+    verts, idx = [], []
+    for face in faces:
+        n = len(verts) // 3
+        for v in face: verts += v
+        idx += (n, n + 1, n + 2, n, n + 2, n + 3)
+    return verts, idx
+
+TESSELLATORS = {
+    "cylinder": tessellate_cylinder,
+    "sphere": tessellate_sphere,
+    "cone": tessellate_cone,
+    "cube": tessellate_cube,
+}
+
+class Mesh:
+    """Packed triangle mesh drawn with one glDrawElements call."""
+    def __init__(self, verts, idx):
+        self.count = len(idx)
+        self.verts = (GLfloat * len(verts))(*verts)
+        self.idx = (GLuint * len(idx))(*idx)
 
-            glVertex3f(x0, y0, z0)
-            glVertex3f(x1, y1, z0)
-            glVertex3f(0.0, 0.0, z1)
-        glEnd()
+    def draw(self):
+        glVertexPointer(3, GL_FLOAT, 0, self.verts)
+        glDrawElements(GL_TRIANGLES, self.count, GL_UNSIGNED_INT, self.idx)
 
-def draw_cube(size):
-    half_size = size / 2.0  # Half of the cube's size for easier vertex calculation
-
-    # Draw the 6 faces of the cube
-    # Front face
-    glBegin(GL_QUADS)
-    glVertex3f(-half_size, -half_size, half_size)  # Bottom-left
-    glVertex3f( half_size, -half_size, half_size)  # Bottom-right
-    glVertex3f( half_size,  half_size, half_size)  # Top-right
-    glVertex3f(-half_size,  half_size, half_size)  # Top-left
-    glEnd()
+_mesh_cache = {}
 
-    # Back face
-    glBegin(GL_QUADS)
-    glVertex3f(-half_size, -half_size, -half_size)  # Bottom-left
-    glVertex3f(-half_size,  half_size, -half_size)  # Top-left
-    glVertex3f( half_size,  half_size, -half_size)  # Top-right
-    glVertex3f( half_size, -half_size, -half_size)  # Bottom-right
-    glEnd()
+def get_mesh(shape, *params):
+    key = (shape,) + params
+    mesh = _mesh_cache.get(key)
+    if mesh is None:
+        mesh = _mesh_cache[key] = Mesh(*TESSELLATORS[shape](*params))
+    return mesh
 
-    # Left face
-    glBegin(GL_QUADS)
-    glVertex3f(-half_size, -half_size, -half_size)  # Bottom-front
-    glVertex3f(-half_size, -half_size,  half_size)  # Bottom-back
-    glVertex3f(-half_size,  half_size,  half_size)  # Top-back
-    glVertex3f(-half_size,  half_size, -half_size)  # Top-front
-    glEnd()
+def draw_cylinder(base_radius, top_radius, height, slices, stacks):
+    get_mesh("cylinder", base_radius, top_radius, height, slices, stacks).draw()
 
-    # Right face
-    glBegin(GL_QUADS)
-    glVertex3f( half_size, -half_size, -half_size)  # Bottom-front
-    glVertex3f( half_size,  half_size, -half_size)  # Top-front
-    glVertex3f( half_size,  half_size,  half_size)  # Top-back
-    glVertex3f( half_size, -half_size,  half_size)  # Bottom-back
-    glEnd()
+def draw_sphere(radius, slices, stacks):
+    get_mesh("sphere", radius, slices, stacks).draw()
 
-    # Top face
-    glBegin(GL_QUADS)
-    glVertex3f(-half_size,  half_size, -half_size)  # Back-left
-    glVertex3f(-half_size,  half_size,  half_size)  # Front-left
-    glVertex3f( half_size,  half_size,  half_size)  # Front-right
-    glVertex3f( half_size,  half_size, -half_size)  # Back-right
-    glEnd()
+def draw_cone(base_radius, height, slices, stacks):
+    get_mesh("cone", base_radius, height, slices, stacks).draw()
 
-    # Bottom face
-    glBegin(GL_QUADS)
-    glVertex3f(-half_size, -half_size, -half_size)  # Back-left
-    glVertex3f( half_size, -half_size, -half_size)  # Back-right
-    glVertex3f( half_size, -half_size,  half_size)  # Front-right
-    glVertex3f(-half_size, -half_size,  half_size)  # Front-left
-    glEnd()
+def draw_cube(size):
+    get_mesh("cube", size).draw()
+
+# Creature models are written once against a small builder interface (g.push,
+# g.translate, g.color, g.shape, ...). GLModelTarget replays them as GL calls into
+# a display list; MeshBaker flattens them into one vertex-colored mesh for
+# instanced drawing. color(..., tint=n) marks parts that take instance color n.
+def lod_params(name, params, lod):
+    """Shape params with the trailing slices/stacks scaled down for `lod`."""
+    if lod == 0 or name == "cube": return params
+    k = LOD_SEGMENT_SCALE[lod]
+    *size, slices, stacks = params
+    return (*size, max(6, int(slices * k)), max(1 if name != "sphere" else 4, int(stacks * k)))
+
+class GLModelTarget:
+    def __init__(self, lod=0): self.lod = lod
+    def detail(self): return self.lod < LOD_DROP_DETAIL
+    def push(self): glPushMatrix()
+    def pop(self): glPopMatrix()
+    def translate(self, x, y, z): glTranslatef(x, y, z)
+    def rotate(self, angle, x, y, z): glRotatef(angle, x, y, z)
+    def scale(self, x, y, z): glScalef(x, y, z)
+    def color(self, rgb, tint=0): glColor3f(*rgb)
+    def shape(self, name, *params): get_mesh(name, *lod_params(name, params, self.lod)).draw()
+    def fin(self, a, b, c):
+        # flat double-sided triangle
+        glDisable(GL_CULL_FACE)
+        glBegin(GL_TRIANGLES)
+        glVertex3f(*a); glVertex3f(*b); glVertex3f(*c)
+        glEnd()
+        glEnable(GL_CULL_FACE)
+
+def _mat_mul(a, b):
+    return [sum(a[r * 4 + k] * b[k * 4 + c] for k in range(4)) for r in range(4) for c in range(4)]
+
+class MeshBaker:
+    # interleaved per-vertex layout: x, y, z, r, g, b, tint, tail
+    STRIDE = 8
+
+    def __init__(self, lod=0):
+        self.lod = lod
+        self.m = [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0]
+        self.stack = []
+        self.rgb = (1.0, 1.0, 1.0); self.tint = 0
+        self.tail = 0.0
+        self.verts = []; self.idx = []
+
+    def push(self): self.stack.append(self.m)
+    def pop(self): self.m = self.stack.pop()
+    def translate(self, x, y, z):
+        self.m = _mat_mul(self.m, [1, 0, 0, x, 0, 1, 0, y, 0, 0, 1, z, 0, 0, 0, 1])
+    def rotate(self, angle, x, y, z):
+        n = math.sqrt(x * x + y * y + z * z); x, y, z = x / n, y / n, z / n
+        c = math.cos(radians(angle)); s = math.sin(radians(angle)); t = 1.0 - c
+        self.m = _mat_mul(self.m, [t * x * x + c, t * x * y - s * z, t * x * z + s * y, 0,
+                                   t * x * y + s * z, t * y * y + c, t * y * z - s * x, 0,
+                                   t * x * z - s * y, t * y * z + s * x, t * z * z + c, 0,
+                                   0, 0, 0, 1])
+    def scale(self, x, y, z):
+        self.m = _mat_mul(self.m, [x, 0, 0, 0, 0, y, 0, 0, 0, 0, z, 0, 0, 0, 0, 1])
+    def color(self, rgb, tint=0): self.rgb = rgb; self.tint = tint
+
+    def _add(self, verts, idx):
+        m = self.m; base = len(self.verts) // self.STRIDE
+        for i in range(0, len(verts), 3):
+            x, y, z = verts[i], verts[i + 1], verts[i + 2]
+            self.verts += (m[0] * x + m[1] * y + m[2] * z + m[3],
+                           m[4] * x + m[5] * y + m[6] * z + m[7],
+                           m[8] * x + m[9] * y + m[10] * z + m[11],
+                           self.rgb[0], self.rgb[1], self.rgb[2], self.tint, self.tail)
+        self.idx += (base + i for i in idx)
+
+    def detail(self): return self.lod < LOD_DROP_DETAIL
+    def shape(self, name, *params): self._add(*TESSELLATORS[name](*lod_params(name, params, self.lod)))
+    def fin(self, a, b, c): self._add(a + b + c, (0, 1, 2, 0, 2, 1))
+
+class Model:
+    """Display list built lazily from a builder on first draw (needs a live GL context)."""
+    live = weakref.WeakSet()  # every Model, so all lists can be rebuilt at once
+
+    def __init__(self, build, lod=0):
+        self.build = build
+        self.lod = lod
+        self.list_id = 0
+        Model.live.add(self)
+
+    def draw(self):
+        if not self.list_id:
+            self.list_id = glGenLists(1)
+            glNewList(self.list_id, GL_COMPILE)
+            self.build(GLModelTarget(self.lod))
+            glEndList()
+        glCallList(self.list_id)
+
+    def release(self):
+        if self.list_id:
+            glDeleteLists(self.list_id, 1)
+            self.list_id = 0
+
+# Instanced batches: one baked mesh drawn N times with per-instance
+# position + tail angle and two instance colors, from a per-frame buffer.
+BATCH_VERTEX_SHADER = """
+#version 120
+attribute vec3 position;
+attribute vec3 color;
+attribute vec2 tint_tail;
+attribute vec4 inst_pos;
+attribute vec3 inst_color_a;
+attribute vec3 inst_color_b;
+uniform vec3 tail_pivot;
+varying vec3 v_color;
+void main() {
+    vec3 p = position;
+    if (tint_tail.y > 0.5) {
+        float a = radians(inst_pos.w);
+        vec3 q = p - tail_pivot;
+        p = tail_pivot + vec3(q.x * cos(a) + q.z * sin(a), q.y, q.z * cos(a) - q.x * sin(a));
+    }
+    v_color = tint_tail.x < 0.5 ? color : (tint_tail.x < 1.5 ? inst_color_a : inst_color_b);
+    gl_Position = gl_ModelViewProjectionMatrix * vec4(p + inst_pos.xyz, 1.0);
+}
+"""
+BATCH_FRAGMENT_SHADER = """
+#version 120
+varying vec3 v_color;
+void main() { gl_FragColor = vec4(v_color, 1.0); }
+"""
+BATCH_ATTRIBS = ("position", "color", "tint_tail", "inst_pos", "inst_color_a", "inst_color_b")
+# per-instance layout: x, y, z, tail_angle, color_a rgb, color_b rgb
+BATCH_INSTANCE_FLOATS = 10
+
+_batch_program = None
+
+def _compile_shader(kind, src):
+    sh = glCreateShader(kind)
+    glShaderSource(sh, src); glCompileShader(sh)
+    if not glGetShaderiv(sh, GL_COMPILE_STATUS):
+        raise RuntimeError(glGetShaderInfoLog(sh))
+    return sh
+
+def batch_program():
+    global _batch_program
+    if _batch_program is None:
+        prog = glCreateProgram()
+        glAttachShader(prog, _compile_shader(GL_VERTEX_SHADER, BATCH_VERTEX_SHADER))
+        glAttachShader(prog, _compile_shader(GL_FRAGMENT_SHADER, BATCH_FRAGMENT_SHADER))
+        for loc, name in enumerate(BATCH_ATTRIBS): glBindAttribLocation(prog, loc, name)
+        glLinkProgram(prog)
+        if not glGetProgramiv(prog, GL_LINK_STATUS):
+            raise RuntimeError(glGetProgramInfoLog(prog))
+        _batch_program = prog
+    return _batch_program
+
+def instancing_supported():
+    try:
+        major, minor = (int(v) for v in glGetString(GL_VERSION).split()[0].split(b".")[:2])
+        if (major, minor) < (3, 3) or not (glDrawElementsInstanced and glVertexAttribDivisor):
+            return False
+        batch_program()
+        return True
+    except Exception as e:
+        print(f"Instanced rendering unavailable, using display lists: {e}")
+        return False
+
+class InstancedBatch:
+    def __init__(self, build, tail_pivot=(0.0, 0.0, 0.0), lod=0):
+        self.build = build
+        self.tail_pivot = tail_pivot
+        self.lod = lod
+        self.vao = 0
+
+    def _setup(self):
+        baker = MeshBaker(self.lod); self.build(baker)
+        self.count = len(baker.idx)
+        self.vao = glGenVertexArrays(1)
+        glBindVertexArray(self.vao)
+        vbo, ebo, self.inst_vbo = glGenBuffers(3)
+        glBindBuffer(GL_ARRAY_BUFFER, vbo)
+        glBufferData(GL_ARRAY_BUFFER, (GLfloat * len(baker.verts))(*baker.verts), GL_STATIC_DRAW)
+        stride = MeshBaker.STRIDE * 4
+        for loc, size, offset in ((0, 3, 0), (1, 3, 12), (2, 2, 24)):
+            glEnableVertexAttribArray(loc)
+            glVertexAttribPointer(loc, size, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(offset))
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, ebo)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, (GLuint * len(baker.idx))(*baker.idx), GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, self.inst_vbo)
+        stride = BATCH_INSTANCE_FLOATS * 4
+        for loc, size, offset in ((3, 4, 0), (4, 3, 16), (5, 3, 28)):
+            glEnableVertexAttribArray(loc)
+            glVertexAttribPointer(loc, size, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(offset))
+            glVertexAttribDivisor(loc, 1)
+        glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.buffers = (vbo, ebo, self.inst_vbo)
+
+    def release(self):
+        if self.vao:
+            glDeleteBuffers(3, self.buffers)
+            glDeleteVertexArrays(1, [self.vao])
+            self.vao = 0
+
+    def draw(self, instances):
+        """instances: flat list, or float32 NumPy array, of per-instance rows."""
+        if isinstance(instances, np.ndarray):
+            data = np.ascontiguousarray(instances, np.float32)
+            n = data.size // BATCH_INSTANCE_FLOATS
+        else:
+            n = len(instances) // BATCH_INSTANCE_FLOATS
+        if n == 0: return
+        if not self.vao: self._setup()
+        prog = batch_program()
+        glUseProgram(prog)
+        glUniform3f(glGetUniformLocation(prog, "tail_pivot"), *self.tail_pivot)
+        glBindVertexArray(self.vao)
+        glBindBuffer(GL_ARRAY_BUFFER, self.inst_vbo)
+        if not isinstance(instances, np.ndarray):
+            data = (GLfloat * len(instances))(*instances)
+        glBufferData(GL_ARRAY_BUFFER, data, GL_STREAM_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glDrawElementsInstanced(GL_TRIANGLES, self.count, GL_UNSIGNED_INT, None, n)
+        glBindVertexArray(0)
+        glUseProgram(0)
+
+batch_enabled = False  # set by init_gl once the context is known
 
 
 # Camera
@@ -271,8 +490,10 @@ class Camera:
         self.pitch_deg = CAM_PITCH_DEG
         self.aspect = WINDOW_WIDTH / max(1, WINDOW_HEIGHT)
         self.target = (0.0, 0.0, 0.0)
+        self.height = WINDOW_HEIGHT
+        self.planes = None  # frustum planes of the last apply()
 
-    def resize(self, w, h): self.aspect = (w / max(1, h))
+    def resize(self, w, h): self.aspect = (w / max(1, h)); self.height = max(1, h)
 
     def apply(self):
         glMatrixMode(GL_PROJECTION)
@@ -282,12 +503,83 @@ class Camera:
         glMatrixMode(GL_MODELVIEW)
         glLoadIdentity()
         gluLookAt(x, y, z, self.target[0], self.target[1], self.target[2], 0, 0, 1)
+        self.planes = self.frustum_planes()
+
+    def frustum_planes(self):
+        """(6, 4) normalized planes (a, b, c, d), inside where a*x + b*y + c*z + d >= 0."""
+        f = 1.0 / math.tan(radians(FOV_Y) * 0.5)
+        proj = np.array([[f / self.aspect, 0, 0, 0], [0, f, 0, 0],
+                         [0, 0, (Z_FAR + Z_NEAR) / (Z_NEAR - Z_FAR), 2 * Z_FAR * Z_NEAR / (Z_NEAR - Z_FAR)],
+                         [0, 0, -1, 0]])
+        eye = np.array(self._eye()); fwd = np.array(self.target) - eye
+        fwd /= np.linalg.norm(fwd)
+        side = np.cross(fwd, (0.0, 0.0, 1.0)); side /= np.linalg.norm(side)
+        up = np.cross(side, fwd)
+        view = np.identity(4)
+        view[0, :3], view[1, :3], view[2, :3] = side, up, -fwd
+        view[:3, 3] = -view[:3, :3] @ eye
+        m = self.view_proj = proj @ view
+        planes = np.array([m[3] + m[0], m[3] - m[0], m[3] + m[1], m[3] - m[1], m[3] + m[2], m[3] - m[2]])
+        return planes / np.linalg.norm(planes[:, :3], axis=1)[:, None]
+
+    def sphere_visible(self, x, y, z, r):
+        if not CULLING_ENABLED or self.planes is None: return True
+        for a, b, c, d in self.planes:
+            if a * x + b * y + c * z + d < -r: return False
+        return True
+
+    def spheres_visible(self, xs, ys, zs, r):
+        """Vectorized sphere_visible; zs may be a scalar."""
+        if not CULLING_ENABLED or self.planes is None: return np.ones(len(xs), bool)
+        p = self.planes
+        dist = xs[:, None] * p[:, 0] + ys[:, None] * p[:, 1] + np.asarray(zs)[..., None] * p[:, 2] + p[:, 3]
+        return (dist >= -r).all(axis=1)
+
+    def ground_bounds(self, z0, z1):
+        """(xmin, ymin, xmax, ymax) of the z0..z1 slab inside the frustum, or None."""
+        ndc = np.array([(x, y, z, 1.0) for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)])
+        c = ndc @ np.linalg.inv(self.view_proj).T
+        c = c[:, :3] / c[:, 3:]
+        # the 12 box edges join corners that differ in one NDC bit
+        a, b = np.array([(i, i | bit) for i in range(8) for bit in (1, 2, 4) if not i & bit]).T
+        pts = [c[(c[:, 2] >= z0) & (c[:, 2] <= z1), :2]]
+        za, zb = c[a, 2], c[b, 2]
+        for z in (z0, z1):
+            hit = (za - z) * (zb - z) <= 0.0
+            t = (z - za[hit]) / np.where(zb[hit] != za[hit], zb[hit] - za[hit], 1.0)
+            pts.append(c[a[hit], :2] + (c[b[hit], :2] - c[a[hit], :2]) * t[:, None])
+        pts = np.concatenate(pts)
+        if not len(pts): return None
+        return (*pts.min(0), *pts.max(0))
 
     def _eye(self):
         r = self.distance
         yaw = radians(self.yaw_deg)
         pitch = radians(self.pitch_deg)
-        return r * math.cos(pitch) * math.cos(yaw), r * math.cos(pitch) * math.sin(yaw), r * math.sin(pitch)
+        tx, ty, tz = self.target
+        return (tx + r * math.cos(pitch) * math.cos(yaw), ty + r * math.cos(pitch) * math.sin(yaw),
+                tz + r * math.sin(pitch))
+
+    def pixels_per_unit(self):
+        """Screen pixels covered by one world unit at distance 1."""
+        return self.height * 0.5 / math.tan(radians(FOV_Y) * 0.5)
+
+    def lod_level(self, x, y, z, radius):
+        if not LOD_ENABLED: return 0
+        ex, ey, ez = self._eye()
+        d = math.sqrt((x - ex) ** 2 + (y - ey) ** 2 + (z - ez) ** 2) + 1e-6
+        px = 2.0 * radius * self.pixels_per_unit() / d
+        for lod, limit in enumerate(LOD_THRESHOLDS_PX):
+            if px >= limit: return lod
+        return len(LOD_THRESHOLDS_PX)
+
+    def lod_levels(self, xs, ys, z, radius):
+        """Vectorized lod_level for arrays of positions at height z."""
+        if not LOD_ENABLED: return np.zeros(len(xs), np.int64)
+        ex, ey, ez = self._eye()
+        d = np.sqrt((xs - ex) ** 2 + (ys - ey) ** 2 + (z - ez) ** 2) + 1e-6
+        px = 2.0 * radius * self.pixels_per_unit() / d
+        return np.searchsorted(-np.asarray(LOD_THRESHOLDS_PX), -px, side="left")
 
 # Huds
 def draw_axes(length=200.0):
@@ -298,19 +590,22 @@ def draw_axes(length=200.0):
     glColor3f(0.2, 0.4, 1.0); glVertex3f(0, 0, 0); glVertex3f(0, 0, length)
     glEnd()
 
-def draw_grid_lines():
+def draw_grid_lines(xs, ys):
+    """Grid lines over the cells in ranges xs, ys (one floor chunk)."""
     if not SHOW_GRID_LINES: return
-    half, s = GRID_HALF_CELLS, CELL_SIZE
-    extent = (2 * half + 1) * s * 0.5
+    s = S.CELL_SIZE
+    extent = (2 * grid_half_cells() + 1) * s * 0.5
+    x0, x1 = max(-extent, xs[0] * s), min(extent, (xs[-1] + 1) * s)
+    y0, y1 = max(-extent, ys[0] * s), min(extent, (ys[-1] + 1) * s)
     glLineWidth(1.0)
     glColor3f(0.25, 0.35, 0.40)
     glBegin(GL_LINES)
-    for i in range(-half, half + 1):
+    for i in ys:
         y = i * s
-        glVertex3f(-extent, y, 0.2); glVertex3f(extent, y, 0.2)
-    for i in range(-half, half + 1):
+        glVertex3f(x0, y, 0.2); glVertex3f(x1, y, 0.2)
+    for i in xs:
         x = i * s
-        glVertex3f(x, -extent, 0.2); glVertex3f(x, extent, 0.2)
+        glVertex3f(x, y0, 0.2); glVertex3f(x, y1, 0.2)
     glEnd()
 
 
@@ -357,34 +652,140 @@ def hud_end():
     glMatrixMode(GL_MODELVIEW); glPopMatrix()
     glMatrixMode(GL_PROJECTION); glPopMatrix()
 
+HUD_FONT = GLUT_BITMAP_9_BY_15
+
+class HudText:
+    """HUD strings as display lists, recompiled only when a slot's text or color changes."""
+    def __init__(self, font=HUD_FONT):
+        self.font = font
+        self.glyph_base = 0
+        self.slots = {}  # (x, y) -> ((text, color), list_id)
+
+    def _glyphs(self):
+        if not self.glyph_base:
+            self.glyph_base = glGenLists(256)
+            for i in range(256):
+                glNewList(self.glyph_base + i, GL_COMPILE)
+                glutBitmapCharacter(self.font, i)
+                glEndList()
+        return self.glyph_base
+
+    def draw(self, x, y, text, color):
+        slot = self.slots.get((x, y))
+        if slot is None or slot[0] != (text, color):
+            base = self._glyphs()
+            list_id = slot[1] if slot else glGenLists(1)
+            glNewList(list_id, GL_COMPILE)
+            glColor3f(*color)
+            glRasterPos2f(x, y)
+            glListBase(base)
+            glCallLists(text.encode("latin-1", "replace"))
+            glEndList()
+            slot = self.slots[(x, y)] = ((text, color), list_id)
+        glCallList(slot[1])
+
+    def release(self):
+        for _, list_id in self.slots.values(): glDeleteLists(list_id, 1)
+        self.slots.clear()
+        if self.glyph_base:
+            glDeleteLists(self.glyph_base, 256)
+            self.glyph_base = 0
+
+hud_cache = HudText()
+
 def hud_text(x, y, text, r=1.0, g=1.0, b=1.0):
-    glColor3f(r, g, b)
-    glRasterPos2f(x, y)
-    for ch in text: glutBitmapCharacter(GLUT_BITMAP_9_BY_15, ord(ch))
+    hud_cache.draw(x, y, text, (r, g, b))
+
+
+# Particle system: state lives in preallocated NumPy arrays, is advanced and
+# respawned with vectorized ops, and is drawn from a single vertex array.
+class ParticleSystem:
+    def __init__(self, capacity, color, streak=0.0, point_size=3.0):
+        self.pos = np.zeros((capacity, 3), np.float32)
+        self.vel = np.zeros((capacity, 3), np.float32)
+        self.life = np.zeros(capacity, np.float32)  # seconds left, <= 0 is a free slot
+        self.color = color
+        self.streak = streak          # > 0 draws each particle as a falling line of this length
+        self.point_size = point_size
+
+    def emit(self, pos, vel, life):
+        free = np.flatnonzero(self.life <= 0.0)[:len(pos)]
+        n = len(free)
+        self.pos[free] = pos[:n]; self.vel[free] = vel[:n]; self.life[free] = life
+        return n
+
+    def emit_ring(self, cx, cy, cz, radius, n, speed, life):
+        th = np.linspace(0.0, 2.0 * math.pi, n, endpoint=False)
+        ring = np.stack([np.cos(th), np.sin(th), np.zeros(n)], axis=1)
+        self.emit(ring * radius + (cx, cy, cz), ring * speed, life)
+
+    def update(self, dt):
+        alive = self.life > 0.0
+        self.pos[alive] += self.vel[alive] * dt
+        self.life[alive] -= dt
+
+    def draw(self, camera=None):
+        """Draws live particles; with a camera, returns how many were frustum-culled."""
+        pts = self.pos[self.life > 0.0]
+        culled = 0
+        if camera is not None and len(pts):
+            vis = camera.spheres_visible(pts[:, 0], pts[:, 1], pts[:, 2] - self.streak * 0.5, self.streak * 0.5)
+            culled = len(pts) - int(vis.sum())
+            if culled: pts = pts[vis]
+        n = len(pts)
+        if n == 0: return culled
+        glColor3f(*self.color)
+        if self.streak > 0.0:
+            verts = np.empty((n * 2, 3), np.float32)
+            verts[0::2] = pts; verts[1::2] = pts
+            verts[1::2, 2] -= self.streak
+            glLineWidth(1.0)
+            glVertexPointer(3, GL_FLOAT, 0, verts)
+            glDrawArrays(GL_LINES, 0, n * 2)
+        else:
+            glPointSize(self.point_size)
+            glVertexPointer(3, GL_FLOAT, 0, pts)
+            glDrawArrays(GL_POINTS, 0, n)
+        return culled
+
+class RainParticles(ParticleSystem):
+    """Endless rain around `center`, capped at the arena."""
+    def __init__(self, count):
+        super().__init__(count, RAIN_COLOR, streak=RAIN_STREAK)
+        self.center = (0.0, 0.0)
+        self.half = min(RAIN_AREA_HALF, (2 * grid_half_cells() + 1) * S.CELL_SIZE * 0.5)
+        self.life[:] = np.inf
+        self.vel[:, 2] = -RAIN_SPEED
+        self._respawn(np.ones(count, bool))
+
+    def _respawn(self, mask):
+        n = int(mask.sum())
+        (cx, cy), half = self.center, self.half
+        self.pos[mask, 0] = np.random.uniform(cx - half, cx + half, n)
+        self.pos[mask, 1] = np.random.uniform(cy - half, cy + half, n)
+        self.pos[mask, 2] = np.random.uniform(160.0, 260.0, n)
+
+    def update(self, dt):
+        self.pos += self.vel * dt
+        low = self.pos[:, 2] < 6.0
+        if low.any(): self._respawn(low)
 
 
-class World:
+class WorldView:
+    """Renders a Simulation.World: sky, cached floor per phase and weather."""
     def __init__(self):
-        self.phase = "AM"
-        self._t = 0.0
-        self.weather = "clear"
-        self._last_roll = time.time()
-        self._rain = [(random.uniform(-1, 1), random.uniform(-1, 1), random.uniform(160, 260))
-                      for _ in range(160)]
+        self.rain = RainParticles(RAIN_DROPS)
+        self._floor_cache = OrderedDict()  # (phase, chunk) -> Model, least recently drawn first
+        self._overlay = None
+        self._floor_layout = None
 
-    def update(self, dt):
-        self._t += dt
-        p = int((self._t // TIME_OF_DAY_DURATION_SEC) % 3)
-        self.phase = ("AM", "PM", "EVE")[p]
-        if time.time() - self._last_roll > 20.0:
-            self._last_roll = time.time()
-            if random.random() < 0.25:
-                self.weather = random.choice(["clear", "fog", "rain"])
-
-    def apply_clear(self):
-        if self.phase == "AM":
+    def update(self, world, dt):
+        if world.weather == "rain": self.rain.update(dt)
+
+    def apply_clear(self, world):
+        if world.phase == "AM":
             glClearColor(*COLOR_MORNING_SKY, 1.0)
-        elif self.phase == "PM":
+        elif world.phase == "PM":
             glClearColor(*COLOR_AFTERNOON_SKY, 1.0)
         else:
             glClearColor(*COLOR_EVENING_SKY, 1.0)
@@ -392,13 +793,35 @@ class World:
     def _set_fog(self, on):
         return
 
-    def draw(self):
-        half, s = GRID_HALF_CELLS, CELL_SIZE
-        base = {"AM": COLOR_MORNING_FLOOR, "PM": COLOR_AFTERNOON_FLOOR, "EVE": COLOR_EVENING_FLOOR}[self.phase]
+    def _chunk(self, ci, cj):
+        """Cell ranges and bounding sphere of floor chunk (ci, cj)."""
+        half, s, n = grid_half_cells(), S.CELL_SIZE, FLOOR_CHUNK_CELLS
+        x0, y0 = -half + ci * n, -half + cj * n
+        xs = range(x0, min(x0 + n, half + 1)); ys = range(y0, min(y0 + n, half + 1))
+        w, h = len(xs) * s, len(ys) * s
+        return xs, ys, (x0 * s + w * 0.5, y0 * s + h * 0.5, 0.0, math.hypot(w, h) * 0.5 + s)
+
+    def _visible_chunks(self, camera):
+        """Chunk indices overlapping the camera's view of the floor (all without a camera)."""
+        half, s, n = grid_half_cells(), S.CELL_SIZE, FLOOR_CHUNK_CELLS
+        last = (2 * half) // n
+        if camera is None or not CULLING_ENABLED or camera.planes is None:
+            return [(ci, cj) for ci in range(last + 1) for cj in range(last + 1)]
+        bounds = camera.ground_bounds(0.0, s)  # floor and obstacle cubes
+        if bounds is None: return []
+        lo_x, lo_y, hi_x, hi_y = bounds
+        def chunk_range(lo, hi):
+            first = max(0, (math.floor(lo / s) + half) // n)
+            return range(first, min(last, (math.floor(hi / s) + half) // n) + 1)
+        return [(ci, cj) for ci in chunk_range(lo_x, hi_x) for cj in chunk_range(lo_y, hi_y)]
+
+    def _build_floor_chunk(self, phase, xs, ys):
+        s = S.CELL_SIZE
+        base = {"AM": COLOR_MORNING_FLOOR, "PM": COLOR_AFTERNOON_FLOOR, "EVE": COLOR_EVENING_FLOOR}[phase]
 
         glBegin(GL_QUADS)
-        for ix in range(-half, half + 1):
-            for iy in range(-half, half + 1):
+        for ix in xs:
+            for iy in ys:
                 x0 = ix * s; y0 = iy * s; x1 = x0 + s; y1 = y0 + s
                 odd = (ix + iy) & 1
                 c = (base[0] * (0.95 if odd else 1.05),
@@ -408,401 +831,381 @@ class World:
                 glVertex3f(x0, y0, 0); glVertex3f(x1, y0, 0); glVertex3f(x1, y1, 0); glVertex3f(x0, y1, 0)
         glEnd()
 
-        draw_grid_lines()
-        if SHOW_AXES: draw_axes(200.0)
-
-        self._set_fog(self.weather == "fog")
-        if self.weather == "rain": self._draw_rain(half, s)
-
-    def _draw_rain(self, half, s):
-        size = (2 * half + 1) * s
-        glLineWidth(1.0)
-        glColor3f(0.85, 0.90, 0.95)
-        glBegin(GL_LINES)
-        for i, (rx, ry, rz) in enumerate(self._rain):
-            x = rx * size * 0.5; y = ry * size * 0.5
-            glVertex3f(x, y, rz); glVertex3f(x, y, rz - 14.0)
-            rz -= 12.0
-            if rz < 6.0:
-                rz = random.uniform(160.0, 260.0)
-                rx = random.uniform(-1, 1); ry = random.uniform(-1, 1)
-            self._rain[i] = (rx, ry, rz)
-        glEnd()
+        glColor3f(*OBSTACLE_COLOR)
+        for ix, iy in S.ARENA_OBSTACLES:
+            if ix not in xs or iy not in ys: continue
+            glPushMatrix()
+            glTranslatef((ix + 0.5) * s, (iy + 0.5) * s, s * 0.45)
+            draw_cube(s * 0.9)
+            glPopMatrix()
 
-class Cat:
-    def __init__(self):
-        self.x = 0.0; self.y = 0.0; self.yaw_deg = 0.0
-        self.base_z = CAT_Z_OFFSET; self.jump_t = -1.0; self.jump_cd = 0.0
-        self.step_mult = 1.0
-        half, s = GRID_HALF_CELLS, CELL_SIZE
-        self.max_extent = (2 * half + 1) * s * 0.5 - s * 0.5
-
-    def rotate_left(self):  self.yaw_deg = (self.yaw_deg + 90.0) % 360.0
-    def rotate_right(self): self.yaw_deg = (self.yaw_deg - 90.0) % 360.0
-    def move_forward(self):
-        step = CELL_SIZE * self.step_mult; yaw = radians(self.yaw_deg)
-        self._try_move(self.x + math.cos(yaw) * step, self.y + math.sin(yaw) * step)
-    def move_backward(self):
-        step = CELL_SIZE * self.step_mult; yaw = radians(self.yaw_deg)
-        self._try_move(self.x - math.cos(yaw) * step, self.y - math.sin(yaw) * step)
-    def start_jump(self):
-        if self.jump_t < 0 and self.jump_cd <= 0: self.jump_t = 0.0
-    def update(self, dt):
-        if self.jump_cd > 0: self.jump_cd = max(0.0, self.jump_cd - dt)
-        if self.jump_t >= 0.0:
-            self.jump_t += dt / max(1e-6, CAT_JUMP_DURATION)
-            if self.jump_t >= 1.0: self.jump_t = -1.0; self.jump_cd = CAT_JUMP_COOLDOWN
-    def current_z(self):
-        if self.jump_t < 0: return self.base_z
-        t = self.jump_t
-        return self.base_z + 4.0 * CAT_JUMP_HEIGHT * t * (1.0 - t)
-    def _try_move(self, nx, ny):
-        nx = max(-self.max_extent, min(self.max_extent, nx))
-        ny = max(-self.max_extent, min(self.max_extent, ny))
-        self.x, self.y = nx, ny
-    def draw(self):
-        glPushMatrix()
-        glTranslatef(self.x, self.y, self.current_z())
-        glRotatef(self.yaw_deg, 0, 0, 1)
-        glColor3f(*CAT_COLOR_BODY);
-        draw_sphere(CAT_BODY_R, 18, 18)
-        glPushMatrix()
-        glTranslatef(CAT_BODY_R + CAT_HEAD_R * 0.9, 0.0, CAT_BODY_R * 0.4)
-        glColor3f(*CAT_COLOR_HEAD);
-        draw_sphere(CAT_HEAD_R, 18, 18)
-        #ears
-        glPushMatrix()
-        glTranslatef(CAT_HEAD_R * 0.3, CAT_HEAD_R * 0.4, CAT_HEAD_R * 0.8)
-        glRotatef(-90, 1, 0, 0);
-        glColor3f(*CAT_COLOR_EAR);
-        draw_cone(CAT_EAR_R, CAT_EAR_H, 10, 2)
-        glPopMatrix()
-        glPushMatrix()
-        glTranslatef(CAT_HEAD_R * 0.3, -CAT_HEAD_R * 0.4, CAT_HEAD_R * 0.8)
-        glRotatef(-90, 1, 0, 0);
-        glColor3f(*CAT_COLOR_EAR);
-        draw_cone(CAT_EAR_R, CAT_EAR_H, 10, 2)
-        glPopMatrix()
-        glPopMatrix()
-        # legs
-        glColor3f(*CAT_COLOR_LEG)
-        for sx in (-1, 1):
-            for sy in (-1, 1):
-                glPushMatrix()
-                glTranslatef(sx * CAT_BODY_R * 0.5, sy * CAT_BODY_R * 0.5, -CAT_BODY_R * 0.8)
-                glScalef(CAT_LEG_W, CAT_LEG_W, CAT_LEG_H);
-                draw_cube(1.0)
-                glPopMatrix()
-        # tail
-        glPushMatrix()
-        glTranslatef(-CAT_BODY_R * 0.8, 0.0, CAT_BODY_R * 0.5)
-        glRotatef(30, 0, 1, 0); glColor3f(*CAT_COLOR_TAIL)
-        draw_cylinder(CAT_TAIL_R, CAT_TAIL_R * 0.6, CAT_TAIL_L, 8, 1)
-        glPopMatrix()
-        glPopMatrix()
+        draw_grid_lines(xs, ys)
+
+    def _check_layout(self):
+        # Floor chunks (cells, obstacles and grid lines) only change with the
+        # phase or grid config, so each (phase, chunk) display list is built the
+        # first time the chunk is in view and kept until evicted or the config changes.
+        layout = (grid_half_cells(), S.CELL_SIZE, SHOW_GRID_LINES, S.ARENA_OBSTACLES, FLOOR_CHUNK_CELLS)
+        if layout != self._floor_layout:
+            for m in self._floor_cache.values(): m.release()
+            self._floor_cache.clear(); self._floor_layout = layout
+            self.rain.half = min(RAIN_AREA_HALF, (2 * grid_half_cells() + 1) * S.CELL_SIZE * 0.5)
+        if self._overlay is None: self._overlay = Model(lambda g: draw_axes(200.0))
+
+    def _evict_floor(self):
+        cache = self._floor_cache
+        while len(cache) > FLOOR_CHUNK_CACHE:
+            _, model = cache.popitem(last=False)
+            model.release()
+
+    def draw(self, world, camera=None):
+        self._check_layout()
+        phase, cache = world.phase, self._floor_cache
+        drawn = 0
+        for ci, cj in self._visible_chunks(camera):
+            xs, ys, sphere = self._chunk(ci, cj)
+            if camera is not None and not camera.sphere_visible(*sphere): continue
+            key = (phase, ci, cj)
+            model = cache.get(key)
+            if model is None:
+                model = cache[key] = Model(lambda g, xs=xs, ys=ys, p=phase: self._build_floor_chunk(p, xs, ys))
+            else:
+                cache.move_to_end(key)
+            model.draw(); drawn += 1
+        cull_counts["Floor"] += ((2 * grid_half_cells()) // FLOOR_CHUNK_CELLS + 1) ** 2 - drawn
+        self._evict_floor()
+        if SHOW_AXES: self._overlay.draw()
+
+        if camera is not None: self.rain.center = camera.target[:2]
+        self._set_fog(world.weather == "fog")
+        if world.weather == "rain": cull_counts["Rain"] += self.rain.draw(camera)
+
+def build_cat_model(g):
+    g.color(CAT_COLOR_BODY)
+    g.shape("sphere", S.CAT_BODY_R, 18, 18)
+    g.push()
+    g.translate(S.CAT_BODY_R + CAT_HEAD_R * 0.9, 0.0, S.CAT_BODY_R * 0.4)
+    g.color(CAT_COLOR_HEAD)
+    g.shape("sphere", CAT_HEAD_R, 18, 18)
+    #ears
+    g.push()
+    g.translate(CAT_HEAD_R * 0.3, CAT_HEAD_R * 0.4, CAT_HEAD_R * 0.8)
+    g.rotate(-90, 1, 0, 0)
+    g.color(CAT_COLOR_EAR)
+    g.shape("cone", CAT_EAR_R, CAT_EAR_H, 10, 2)
+    g.pop()
+    g.push()
+    g.translate(CAT_HEAD_R * 0.3, -CAT_HEAD_R * 0.4, CAT_HEAD_R * 0.8)
+    g.rotate(-90, 1, 0, 0)
+    g.color(CAT_COLOR_EAR)
+    g.shape("cone", CAT_EAR_R, CAT_EAR_H, 10, 2)
+    g.pop()
+    g.pop()
+    # legs
+    g.color(CAT_COLOR_LEG)
+    for sx in (-1, 1):
+        for sy in (-1, 1):
+            g.push()
+            g.translate(sx * S.CAT_BODY_R * 0.5, sy * S.CAT_BODY_R * 0.5, -S.CAT_BODY_R * 0.8)
+            g.scale(CAT_LEG_W, CAT_LEG_W, CAT_LEG_H)
+            g.shape("cube", 1.0)
+            g.pop()
+    # tail
+    g.push()
+    g.translate(-S.CAT_BODY_R * 0.8, 0.0, S.CAT_BODY_R * 0.5)
+    g.rotate(30, 0, 1, 0); g.color(CAT_COLOR_TAIL)
+    g.shape("cylinder", CAT_TAIL_R, CAT_TAIL_R * 0.6, CAT_TAIL_L, 8, 1)
+    g.pop()
+
+CAT_MODELS = tuple(Model(build_cat_model, lod) for lod in LODS)
+
+def lerp(a, b, t): return a + (b - a) * t
+
+# creatures drawn per LOD this frame, shown with the GL stats (G)
+lod_counts = {"Cat": [0] * len(LODS), "Fish": [0] * len(LODS), "Dog": [0] * len(LODS)}
+
+# creatures, rain drops and floor chunks skipped by frustum culling this frame
+cull_counts = {"Cat": 0, "Fish": 0, "Dog": 0, "Rain": 0, "Floor": 0}
+
+def count_lods(kind, levels):
+    c = lod_counts[kind]
+    if isinstance(levels, int): c[levels] += 1
+    else:
+        for lod, n in enumerate(np.bincount(levels, minlength=len(LODS))): c[lod] += int(n)
+
+def draw_cat(cat):
+    x, y, z = (lerp(cat.prev_x, cat.x, alpha), lerp(cat.prev_y, cat.y, alpha),
+               lerp(cat.prev_z, cat.current_z(), alpha))
+    if not cam.sphere_visible(x, y, z, CAT_BOUND_R):
+        cull_counts["Cat"] += 1; return
+    lod = cam.lod_level(x, y, z, CAT_BOUND_R)
+    count_lods("Cat", lod)
+    glPushMatrix()
+    glTranslatef(x, y, z)
+    glRotatef(cat.yaw_deg, 0, 0, 1)
+    CAT_MODELS[lod].draw()
+    glPopMatrix()
 
 
-class Fish:
-    def __init__(self, x, y, kind="normal"):
-        self.x, self.y = x, y
-        self.z = FISH_Z
-        self.kind = kind
-        self.alive = True
-        self.tail_angle = 0
-        self.timer = None
-        self.vx = 0.0; self.vy = 0.0
-        self.size = 1.0
-        self.color = (0.20, 0.75, 0.95)
-        if kind == "fast":
-            ang = random.uniform(0, 2 * math.pi)
-            self.vx = math.cos(ang) * FISH_FAST_SPEED
-            self.vy = math.sin(ang) * FISH_FAST_SPEED
-        elif kind == "gold":
-            self.color = (1.0, 0.84, 0.0); self.size = 1.8
+def build_fish_model(g, kind):
+    # body
+    g.push()
+    g.color(FISH_BODY_COLORS[kind], tint=1); g.scale(1.6, 1.0, 0.7)
+    g.shape("sphere", S.FISH_BODY_R, 24, 18)
+    g.pop()
+
+    if not g.detail(): return
+
+    # dorsal fin
+    g.push()
+    g.color(FISH_TAIL_COLORS[kind], tint=2); g.translate(-2.0, 0.0, 7.0)
+    g.fin((0.0, 0.0, 0.0), (10.0, 0.0, 0.0), (5.0, 0.0, 6.0))
+    g.pop()
+
+    # pectorals
+    g.push()
+    g.translate(4.0, 7.0, -1.0); g.rotate(90, 0, 1, 0); g.rotate(30, 1, 0, 0)
+    g.shape("cone", 5.0, 10.0, 12, 1)
+    g.pop()
+    g.push()
+    g.translate(4.0, -7.0, -1.0); g.rotate(90, 0, 1, 0); g.rotate(-30, 1, 0, 0)
+    g.shape("cone", 5.0, 10.0, 12, 1)
+    g.pop()
+
+    def _eye(px, py, pz):
+        g.push()
+        g.translate(px, py, pz)
+        g.color((1.0, 1.0, 1.0))
+        g.shape("sphere", 1.5, 12, 10)
+        g.translate(0.6, 0.0, 0.0); g.color((0.05, 0.05, 0.05))
+        g.shape("sphere", 0.8, 10, 8)
+        g.pop()
+    _eye(10.0, 3.0, 3.0); _eye(10.0, -3.0, 3.0)
+
+# The tail is the only animated part: it swings around FISH_TAIL_PIVOT by tail_angle
+FISH_TAIL_PIVOT = (-16.0, 0.0, 0.0)
+FISH_TAIL_TRI = ((0.0, 0.0, 0.0), (-15.0, 9.0, 0.0), (-15.0, -9.0, 0.0))
+
+def build_fish_tail(g):
+    g.fin(*FISH_TAIL_TRI)
+
+def build_fish_batch_mesh(g):
+    build_fish_model(g, "normal")
+    g.push(); g.translate(*FISH_TAIL_PIVOT)
+    g.tail = 1.0; g.color(FISH_TAIL_COLORS["normal"], tint=2)
+    build_fish_tail(g)
+    g.tail = 0.0; g.pop()
+
+FISH_MODELS = tuple({kind: Model(lambda g, kind=kind: build_fish_model(g, kind), lod) for kind in FISH_BODY_COLORS}
+                    for lod in LODS)
+FISH_TAIL_MODEL = Model(build_fish_tail)
+FISH_BATCHES = tuple(InstancedBatch(build_fish_batch_mesh, FISH_TAIL_PIVOT, lod) for lod in LODS)
+
+def draw_fish_at(x, y, z, kind, tail_angle, lod=0):
+    glPushMatrix()
+    glTranslatef(x, y, z)
+    FISH_MODELS[lod][kind].draw()
+    glColor3f(*FISH_TAIL_COLORS[kind])
+    glTranslatef(*FISH_TAIL_PIVOT); glRotatef(tail_angle, 0, 1, 0)
+    FISH_TAIL_MODEL.draw()
+    glPopMatrix()
 
+def draw_fish(f):
+    if not f.alive: return
+    x, y = lerp(f.prev_x, f.x, alpha), lerp(f.prev_y, f.y, alpha)
+    if not cam.sphere_visible(x, y, f.z, FISH_BOUND_R):
+        cull_counts["Fish"] += 1; return
+    lod = cam.lod_level(x, y, f.z, FISH_BOUND_R)
+    count_lods("Fish", lod)
+    draw_fish_at(x, y, f.z, f.kind, f.tail_angle, lod)
+
+def visible_rows(data, radius, kind):
+    """The instance rows whose bounding sphere is inside the frustum."""
+    vis = cam.spheres_visible(data[:, 0], data[:, 1], data[:, 2], radius)
+    cull_counts[kind] += len(data) - int(vis.sum())
+    return data[vis], vis
+
+def draw_batches_by_lod(batches, data, levels, kind):
+    """One instanced draw per LOD for an array of instance rows."""
+    count_lods(kind, levels)
+    for lod, batch in enumerate(batches):
+        batch.draw(data[levels == lod])
+
+# per-kind colors indexed by ArrayFishField.kind
+FISH_KIND_COLORS = np.array([FISH_BODY_COLORS[k] + FISH_TAIL_COLORS[k] for k in FISH_KINDS], np.float32)
+
+def array_fish_instances(field):
+    """Instance rows for the live fish of an ArrayFishField, built column-wise."""
+    live = np.flatnonzero(field.alive)
+    data = np.empty((len(live), BATCH_INSTANCE_FLOATS), np.float32)
+    data[:, 0] = field.prev_x[live] + (field.x[live] - field.prev_x[live]) * alpha
+    data[:, 1] = field.prev_y[live] + (field.y[live] - field.prev_y[live]) * alpha
+    data[:, 2] = S.FISH_Z
+    data[:, 3] = field.tail_angle[live]
+    data[:, 4:] = FISH_KIND_COLORS[field.kind[live]]
+    return data
+
+def draw_fish_field(field):
+    if isinstance(field, ArrayFishField):
+        data, vis = visible_rows(array_fish_instances(field), FISH_BOUND_R, "Fish")
+        levels = cam.lod_levels(data[:, 0], data[:, 1], S.FISH_Z, FISH_BOUND_R)
+        if batch_enabled:
+            draw_batches_by_lod(FISH_BATCHES, data, levels, "Fish")
         else:
-            self.color = (0.20, 0.75, 0.95); self.size = 1.0
-        self.die_at = time.time() + random.uniform(*FISH_TIMED_TTL_S) if kind == "timed" else 1e12
-
-    def activate_powerup(self):
-        if random.choice([True, False]): print("Fish activated: Speed boost!")
-        else: print("Fish activated: Double score!")
-
-    def update(self, dt, extent):
-        if not self.alive: return
-        if time.time() >= self.die_at and self.kind == "timed":
-            self.alive = False; print(f"Timed fish expired at ({self.x}, {self.y})"); return
-        if self.kind in ("fast", "gold"):
-            self.x += self.vx * dt; self.y += self.vy * dt
-            if self.x < -extent or self.x > extent:
-                self.vx *= -1; self.x = max(-extent, min(extent, self.x))
-            if self.y < -extent or self.y > extent:
-                self.vy *= -1; self.y = max(-extent, min(extent, self.y))
-        if self.kind == "timed" and time.time() > self.die_at:
-            self.alive = False
-
-    def draw(self):
-        if not self.alive: return
-        glPushMatrix()
-        glTranslatef(self.x, self.y, self.z)
-
-        # body
-        body_col = FISH_COLOR_BODY if self.kind != "gold" else FISH_COLOR_GOLD
-        glPushMatrix()
-        glColor3f(*body_col); glScalef(1.6, 1.0, 0.7);
-        draw_sphere(FISH_BODY_R, 24, 18)
-        glPopMatrix()
-
-        # tail
-        tail_col = FISH_COLOR_TAIL if self.kind != "gold" else FISH_COLOR_GOLD
-        glPushMatrix()
-        glDisable(GL_CULL_FACE)
-        glColor3f(*tail_col); glTranslatef(-16.0, 0.0, 0.0); glRotatef(self.tail_angle, 0, 1, 0)
-        glBegin(GL_TRIANGLES)
-        glVertex3f(0.0, 0.0, 0.0); glVertex3f(-15.0, 9.0, 0.0); glVertex3f(-15.0, -9.0, 0.0)
-        glEnd()
-        glEnable(GL_CULL_FACE)
-        glPopMatrix()
-
-
-        glPushMatrix()
-        glDisable(GL_CULL_FACE)
-        glColor3f(*tail_col); glTranslatef(-2.0, 0.0, 7.0)
-        glBegin(GL_TRIANGLES)
-        glVertex3f(0.0, 0.0, 0.0); glVertex3f(10.0, 0.0, 0.0); glVertex3f(5.0, 0.0, 6.0)
-        glEnd()
-        glEnable(GL_CULL_FACE)
-        glPopMatrix()
-
-        # pectorals
-        glPushMatrix()
-        glTranslatef(4.0, 7.0, -1.0); glRotatef(90, 0, 1, 0); glRotatef(30, 1, 0, 0)
-        draw_cone(5.0, 10.0, 12, 1)
-        glPopMatrix()
-        glPushMatrix()
-        glTranslatef(4.0, -7.0, -1.0); glRotatef(90, 0, 1, 0); glRotatef(-30, 1, 0, 0)
-        draw_cone(5.0, 10.0, 12, 1)
-        glPopMatrix()
+            count_lods("Fish", levels)
+            for row, k, lod in zip(data, field.kind[field.alive][vis], levels):
+                draw_fish_at(row[0], row[1], row[2], FISH_KINDS[k], row[3], lod)
+        return
+    if not batch_enabled:
+        for f in field.fishes: draw_fish(f)
+        return
+    data = []
+    for f in field.fishes:
+        if f.alive:
+            data.append((lerp(f.prev_x, f.x, alpha), lerp(f.prev_y, f.y, alpha), f.z, f.tail_angle)
+                        + FISH_BODY_COLORS[f.kind] + FISH_TAIL_COLORS[f.kind])
+    data, _ = visible_rows(np.array(data, np.float32).reshape(-1, BATCH_INSTANCE_FLOATS), FISH_BOUND_R, "Fish")
+    draw_batches_by_lod(FISH_BATCHES, data, cam.lod_levels(data[:, 0], data[:, 1], S.FISH_Z, FISH_BOUND_R), "Fish")
+
+def build_dog_model(g, stunned):
+    g.color(DOG_STUN_COLOR if stunned else DOG_COLOR, tint=1)
+    g.shape("sphere", S.DOG_RADIUS * 1.2, 16, 16)
+    g.push()
+    g.translate(S.DOG_RADIUS * 1.4, 0.0, S.DOG_RADIUS * 0.4)
+    g.shape("sphere", S.DOG_RADIUS * 0.8, 16, 16)
+    g.push()
+    g.translate(S.DOG_RADIUS * 0.3, S.DOG_RADIUS * 0.45, S.DOG_RADIUS * 0.7)
+    g.rotate(-90, 1, 0, 0)
+    g.shape("cone", S.DOG_RADIUS * 0.35, S.DOG_RADIUS * 0.9, 10, 2)
+    g.pop()
+    g.push()
+    g.translate(S.DOG_RADIUS * 0.3, -S.DOG_RADIUS * 0.45, S.DOG_RADIUS * 0.7)
+    g.rotate(-90, 1, 0, 0)
+    g.shape("cone", S.DOG_RADIUS * 0.35, S.DOG_RADIUS * 0.9, 10, 2)
+    g.pop()
+    if g.detail():
+        g.push()
+        g.translate(S.DOG_RADIUS * 0.95, 0.0, S.DOG_RADIUS * 0.2)
+        g.rotate(90, 0, 1, 0); g.color((0.05, 0.05, 0.05))
+        g.shape("cone", S.DOG_RADIUS * 0.25, S.DOG_RADIUS * 0.6, 10, 2)
+        g.pop()
+    g.pop()
+    g.color((DOG_COLOR[0] * 0.9, DOG_COLOR[1] * 0.9, DOG_COLOR[2] * 0.9))
+    leg_w = S.DOG_RADIUS * 0.35; leg_h = S.DOG_RADIUS * 0.9
+    for sx in (-1, 1):
+        for sy in (-1, 1):
+            g.push()
+            g.translate(sx * S.DOG_RADIUS * 0.7, sy * S.DOG_RADIUS * 0.7, -S.DOG_RADIUS * 0.9)
+            g.scale(leg_w, leg_w, leg_h)
+            g.shape("cube", 1.0)
+            g.pop()
+
+    g.push()
+    g.translate(-S.DOG_RADIUS * 1.0, 0.0, S.DOG_RADIUS * 0.5)
+    g.rotate(35, 0, 1, 0); g.color(DOG_COLOR)
+    g.shape("cylinder", S.DOG_RADIUS * 0.18, S.DOG_RADIUS * 0.12, S.DOG_RADIUS * 1.2, 8, 1)
+    g.pop()
+
+# DOG_MODELS[lod] is indexed by "is stunned"
+DOG_MODELS = tuple((Model(lambda g: build_dog_model(g, False), lod), Model(lambda g: build_dog_model(g, True), lod))
+                   for lod in LODS)
+DOG_BATCHES = tuple(InstancedBatch(lambda g: build_dog_model(g, False), lod=lod) for lod in LODS)
+
+def draw_dog(d):
+    x, y = lerp(d.prev_x, d.x, alpha), lerp(d.prev_y, d.y, alpha)
+    if not cam.sphere_visible(x, y, d.z, DOG_BOUND_R):
+        cull_counts["Dog"] += 1; return
+    lod = cam.lod_level(x, y, d.z, DOG_BOUND_R)
+    count_lods("Dog", lod)
+    glPushMatrix()
+    glTranslatef(x, y, d.z)
+    DOG_MODELS[lod][d.stunned].draw()
+    glPopMatrix()
 
-        def _eye(px, py, pz):
+def draw_dog_pack_arrays(pack):
+    x = pack.prev_x + (pack.x - pack.prev_x) * alpha
+    y = pack.prev_y + (pack.y - pack.prev_y) * alpha
+    vis = cam.spheres_visible(x, y, S.DOG_Z, DOG_BOUND_R)
+    n = int(vis.sum())
+    cull_counts["Dog"] += len(pack) - n
+    x, y, stunned = x[vis], y[vis], pack.stunned[vis]
+    levels = cam.lod_levels(x, y, S.DOG_Z, DOG_BOUND_R)
+    if not batch_enabled:
+        count_lods("Dog", levels)
+        for k in range(n):
             glPushMatrix()
-            glTranslatef(px, py, pz)
-            glColor3f(1.0, 1.0, 1.0);
-            draw_sphere(1.5, 12, 10)
-            glTranslatef(0.6, 0.0, 0.0); glColor3f(0.05, 0.05, 0.05);
-            draw_sphere(0.8, 10, 8)
+            glTranslatef(x[k], y[k], S.DOG_Z)
+            DOG_MODELS[levels[k]][bool(stunned[k])].draw()
             glPopMatrix()
-        _eye(10.0, 3.0, 3.0); _eye(10.0, -3.0, 3.0)
-
-        glPopMatrix()
-        self.tail_angle = (self.tail_angle + 5) % 360
-
-class FishField:
-    def __init__(self): self.fishes = []
-    def _rand_kind(self):
-        r = random.random()
-        if r < FISH_PROB_GOLD: return "gold"
-        if r < FISH_PROB_FAST: return "fast"
-        if r < FISH_PROB_TIMED: return "timed"
-        return "normal"
-    def spawn_random(self, n=FISH_COUNT):
-        self.fishes.clear()
-        half, s = GRID_HALF_CELLS, CELL_SIZE
-        extent = (2 * half + 1) * s * 0.5 - s * 0.5
-        for _ in range(n):
-            x = random.uniform(-extent, extent); y = random.uniform(-extent, extent)
-            self.fishes.append(Fish(x, y, self._rand_kind()))
-    def update(self, dt):
-        half, s = GRID_HALF_CELLS, CELL_SIZE
-        extent = (2 * half + 1) * s * 0.5 - s * 0.5
-        for f in self.fishes: f.update(dt, extent)
-    def draw(self):
-        for f in self.fishes: f.draw()
-    def collect_if_close(self, px, py, r):
-        got = 0; r2 = r * r
-        for f in self.fishes:
-            if f.alive:
-                dx, dy = f.x - px, f.y - py
-                if dx * dx + dy * dy <= r2:
-                    f.alive = False; got += 1
-        return got
-    def collect_and_report(self, px, py, r):
-        kinds = {"normal": 0, "fast": 0, "timed": 0, "gold": 0}
-        r2 = r * r
-        for f in self.fishes:
-            if f.alive:
-                dx, dy = f.x - px, f.y - py
-                if dx * dx + dy * dy <= r2:
-                    f.alive = False; kinds[f.kind] += 1
-        return kinds
-    def remaining(self): return sum(1 for f in self.fishes if f.alive)
-    def magnet_pull(self, px, py, radius, pull_speed, dt):
-        r2 = radius * radius
-        for f in self.fishes:
-            if not f.alive: continue
-            dx = px - f.x; dy = py - f.y
-            d2 = dx * dx + dy * dy
-            if 1e-9 < d2 <= r2:
-                d = d2 ** 0.5
-                strength = 1.0 - (d / radius)
-                step = pull_speed * strength * dt
-                if step > d: step = d
-                ux, uy = dx / d, dy / d
-                f.x += ux * step; f.y += uy * step
-
-class Dog:
-    def __init__(self, x, y):
-        self.x, self.y = x, y
-        self.z = 25.0
-        self.stunned_until = 0.0
-        self.steal_ready_at = time.time() + random.uniform(*DOG_STEAL_INTERVAL_S)
-    def stunned(self) -> bool: return time.time() < self.stunned_until
-    def update(self, dt, target_xy):
-        if self.stunned(): return
-        tx, ty = target_xy
-        dx, dy = tx - self.x, ty - self.y
-        d = math.hypot(dx, dy) + 1e-6
-        step = DOG_SPEED * dt
-        self.x += (dx / d) * step; self.y += (dy / d) * step
-    def draw(self):
-        glPushMatrix()
-        glTranslatef(self.x, self.y, self.z)
-        glColor3f(0.45, 0.55, 0.95) if self.stunned() else glColor3f(*DOG_COLOR)
-        draw_sphere(DOG_RADIUS * 1.2, 16, 16)
-        glPushMatrix()
-        glTranslatef(DOG_RADIUS * 1.4, 0.0, DOG_RADIUS * 0.4)
-        draw_sphere(DOG_RADIUS * 0.8, 16, 16)
-        glPushMatrix()
-        glTranslatef(DOG_RADIUS * 0.3, DOG_RADIUS * 0.45, DOG_RADIUS * 0.7)
-        glRotatef(-90, 1, 0, 0);
-        draw_cone(DOG_RADIUS * 0.35, DOG_RADIUS * 0.9, 10, 2)
-        glPopMatrix()
-        glPushMatrix()
-        glTranslatef(DOG_RADIUS * 0.3, -DOG_RADIUS * 0.45, DOG_RADIUS * 0.7)
-        glRotatef(-90, 1, 0, 0);
-        draw_cone(DOG_RADIUS * 0.35, DOG_RADIUS * 0.9, 10, 2)
-        glPopMatrix()
-        glPushMatrix()
-        glTranslatef(DOG_RADIUS * 0.95, 0.0, DOG_RADIUS * 0.2)
-        glRotatef(90, 0, 1, 0); glColor3f(0.05, 0.05, 0.05)
-        draw_cone(DOG_RADIUS * 0.25, DOG_RADIUS * 0.6, 10, 2)
-        glPopMatrix()
-        glPopMatrix()
-        glColor3f(DOG_COLOR[0] * 0.9, DOG_COLOR[1] * 0.9, DOG_COLOR[2] * 0.9)
-        leg_w = DOG_RADIUS * 0.35; leg_h = DOG_RADIUS * 0.9
-        for sx in (-1, 1):
-            for sy in (-1, 1):
-                glPushMatrix()
-                glTranslatef(sx * DOG_RADIUS * 0.7, sy * DOG_RADIUS * 0.7, -DOG_RADIUS * 0.9)
-                glScalef(leg_w, leg_w, leg_h);
-                draw_cube(1.0)
-                glPopMatrix()
-
-        glPushMatrix()
-        glTranslatef(-DOG_RADIUS * 1.0, 0.0, DOG_RADIUS * 0.5)
-        glRotatef(35, 0, 1, 0); glColor3f(*DOG_COLOR)
-        draw_cylinder(DOG_RADIUS * 0.18, DOG_RADIUS * 0.12, DOG_RADIUS * 1.2, 8, 1)
-        glPopMatrix()
-        glPopMatrix()
-
-
-class DogPack:
-    def __init__(self):
-        self.dogs = []
-
-    def ensure_count(self, n):
-        while len(self.dogs) < n:
-            self.spawn_random()
+        return
+    data = np.empty((n, BATCH_INSTANCE_FLOATS), np.float32)
+    data[:, 0] = x; data[:, 1] = y; data[:, 2] = S.DOG_Z; data[:, 3] = 0.0
+    data[:, 4:7] = np.where(stunned[:, None], DOG_STUN_COLOR, DOG_COLOR)
+    data[:, 7:] = DOG_COLOR
+    draw_batches_by_lod(DOG_BATCHES, data, levels, "Dog")
+
+def draw_dogs(pack):
+    if isinstance(pack, ArrayDogPack):
+        draw_dog_pack_arrays(pack)
+        return
+    if not batch_enabled:
+        for d in pack.dogs:
+            draw_dog(d)
+        return
+    data = []
+    for d in pack.dogs:
+        data.append((lerp(d.prev_x, d.x, alpha), lerp(d.prev_y, d.y, alpha), d.z, 0.0)
+                    + (DOG_STUN_COLOR if d.stunned else DOG_COLOR) + DOG_COLOR)
+    data, _ = visible_rows(np.array(data, np.float32).reshape(-1, BATCH_INSTANCE_FLOATS), DOG_BOUND_R, "Dog")
+    draw_batches_by_lod(DOG_BATCHES, data, cam.lod_levels(data[:, 0], data[:, 1], S.DOG_Z, DOG_BOUND_R), "Dog")
 
-    def spawn_random(self):
-        half, s = GRID_HALF_CELLS, CELL_SIZE
-        extent = (2 * half + 1) * s * 0.5 - s * 0.5
-        self.dogs.append(Dog(random.uniform(-extent, extent),
-                             random.uniform(-extent, extent)))
+#  GLOBAL STATE 
+cam = Camera()
+clock = GameClock("scaled" if TIME_SCALE != 1.0 else "real", TIME_SCALE)
+profiler = Profiler()
+gl_stats = GLStats()  # installed over this module's GL functions while G is on
+state = GameState(clock, profiler)
+stepper = FixedStepper(state)
+world_view = WorldView()
+meow_fx = ParticleSystem(EFFECT_CAPACITY, MEOW_RING_COLOR)
+decoy_fx = ParticleSystem(EFFECT_CAPACITY, DECOY_COLOR)
 
-    def update(self, dt, target):
-        for d in self.dogs:
-            d.update(dt, target)
+# keyboard actions queued for the next GameState.step
+pending_inputs = []
 
-    def draw(self):
-        for d in self.dogs:
-            d.draw()
-
-    def separate(self, dt):
-        """Push dogs apart so they don't overlap visually."""
-        min_dist = DOG_RADIUS * 2.5          
-        r2 = min_dist * min_dist
-        push = DOG_SPEED * 0.8 * dt          
-        n = len(self.dogs)
-        for i in range(n):
-            for j in range(i + 1, n):
-                a, b = self.dogs[i], self.dogs[j]
-                dx, dy = b.x - a.x, b.y - a.y
-                d2 = dx * dx + dy * dy
-                if 1e-9 < d2 < r2:
-                    d = math.sqrt(d2)
-                    ux, uy = dx / d, dy / d
-                    a.x -= ux * push; a.y -= uy * push
-                    b.x += ux * push; b.y += uy * push
+# blend factor between the previous and current sim tick, set each frame
+alpha = 1.0
 
-#  GLOBAL STATE 
-cam = Camera()
-world = World()
-cat = Cat()
-fish_field = FishField()
-dogs = DogPack()
-
-score = 0
-lives = START_LIVES
-cheat_mode = False
-double_score_until = -1e9
-speed_boost_until = -1e9
-last_meow_at = -1e9
-decoy = None  # {"x","y","expires"}
-
-last_damage_time = -1e9
-game_over = False
-
-last_time = None
 fps_accum = 0.0
 fps_frames = 0
 fps_value = 0.0
-
-# NEW: 10× score power-up timer
-score_x10_until = -1e9
+show_profile = False  # F toggles the stage-timing overlay
+offscreen = False  # set by Offscreen.py when rendering into an FBO without a GLUT window
 
 #  GAME LOGIC 
 def init_gl():
+    global batch_enabled
     glEnable(GL_DEPTH_TEST)
     glShadeModel(GL_SMOOTH)
     glEnable(GL_CULL_FACE); glCullFace(GL_BACK)
-    
-
-def reset_game():
-    global score, lives, decoy, last_meow_at, double_score_until, speed_boost_until
-    global last_damage_time, game_over, score_x10_until
-    score = 0; lives = START_LIVES; game_over = False
-    last_meow_at = -1e9; double_score_until = -1e9; speed_boost_until = -1e9
-    score_x10_until = -1e9
-    last_damage_time = -1e9; decoy = None
-    fish_field.spawn_random()
-    dogs.dogs.clear(); dogs.ensure_count(DOG_COUNT)
-    cat.x = 0.0; cat.y = 0.0; cat.yaw_deg = 0.0
-
-def _meow_ready(): return (time.time() - last_meow_at) >= MEOW_COOLDOWN_S
-
-def do_meow():
-    global last_meow_at
-    if not _meow_ready(): return
-    last_meow_at = time.time()
-    for d in dogs.dogs:
-        dx, dy = d.x - cat.x, d.y - cat.y
-        if dx * dx + dy * dy <= MEOW_RANGE * MEOW_RANGE:
-            d.stunned_until = time.time() + MEOW_STUN_SEC
-
-def drop_decoy():
-    global decoy
-    decoy = {"x": cat.x, "y": cat.y, "expires": time.time() + DECOY_LIFETIME}
+    glEnableClientState(GL_VERTEX_ARRAY)  # primitives are drawn from cached meshes
+    batch_enabled = BATCH_RENDERING and instancing_supported()
+
+def sync_sim_config():
+    """Rebuilds bounding radii and models after Simulation.apply_config()."""
+    global CAT_BOUND_R, DOG_BOUND_R
+    CAT_BOUND_R = S.CAT_BODY_R * 2.0
+    DOG_BOUND_R = S.DOG_RADIUS * 2.4
+    for m in list(Model.live): m.release()
+    for b in FISH_BATCHES + DOG_BATCHES: b.release()
+
+def spawn_effects(events):
+    for name, x, y in events:
+        if name == "meow":
+            meow_fx.emit_ring(x, y, 4.0, S.CAT_BODY_R, 96, (S.MEOW_RANGE - S.CAT_BODY_R) / EFFECT_RING_LIFE, EFFECT_RING_LIFE)
+        elif name == "decoy":
+            decoy_fx.emit_ring(x, y, 4.0, S.DOG_RADIUS * 2.5, 64, 40.0, EFFECT_RING_LIFE * 2)
+    events.clear()
 
 def hud_color_for_env(phase, weather):
     if phase == "AM": r, g, b = (0.0, 1.0, 1.0)
@@ -814,52 +1217,109 @@ def hud_color_for_env(phase, weather):
     return r, g, b
 
 def display():
-    world.apply_clear()
-    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-    cam.apply()
-    world.draw()
+    world, cat = state.world, state.cat
+    prof, gls = profiler, gl_stats
+    for c in lod_counts.values(): c[:] = [0] * len(LODS)
+    for k in cull_counts: cull_counts[k] = 0
+    with gls.section("World"):
+        world_view.apply_clear(world)
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        if cam_follows_cat():
+            cam.target = (lerp(cat.prev_x, cat.x, alpha), lerp(cat.prev_y, cat.y, alpha), 0.0)
+        cam.apply()
+        with prof.section("draw.world"): world_view.draw(world, cam)
 
     # Decoy visuals 
-    d = decoy
-    decoy_active = False
-    if d is not None and d.get("expires", 0) > time.time():
-        decoy_active = True
-        pulse = 1.0 + 0.3 * math.sin(time.time() * 10.0)
+    d = state.decoy
+    decoy_active = state.decoy_active()
+    if decoy_active:
+        pulse = 1.0 + 0.3 * math.sin(state.clock.now * 10.0)
         glLineWidth(4.0); glColor3f(0.2, 1.0, 0.2)
-        draw_ring(d["x"], d["y"], 2.0, DOG_RADIUS * 2.5 * pulse)
+        draw_ring(d["x"], d["y"], 2.0, S.DOG_RADIUS * 2.5 * pulse)
         glPushMatrix()
         glTranslatef(d["x"], d["y"], 2.0)
         glColor3f(0.3, 1.0, 0.3)
-        draw_sphere(DOG_RADIUS * 1.6, 16, 16)
+        draw_sphere(S.DOG_RADIUS * 1.6, 16, 16)
         glPopMatrix()
 
-    fish_field.draw()
-    dogs.draw()
-    cat.draw()
-
-    if cheat_mode:
-        draw_wire_sphere(cat.x, cat.y, cat.current_z(), CHEAT_BUBBLE_RADIUS)
-
+    with prof.section("draw.fish"), gls.section("Fish"): draw_fish_field(state.fish_field)
+    with prof.section("draw.dogs"), gls.section("Dog"): draw_dogs(state.dogs)
+    with prof.section("draw.cat"), gls.section("Cat"): draw_cat(cat)
+    meow_fx.draw()
+    decoy_fx.draw()
+
+    if state.cheat_mode:
+        draw_wire_sphere(lerp(cat.prev_x, cat.x, alpha), lerp(cat.prev_y, cat.y, alpha),
+                         lerp(cat.prev_z, cat.current_z(), alpha), S.CHEAT_BUBBLE_RADIUS)
+
+    if offscreen:
+        # no GLUT window: bitmap fonts are unavailable and there is nothing to swap
+        with prof.section("swap"): glFinish()
+    else:
+        with prof.section("draw.hud"), gls.section("HUD"): draw_hud(world, cat, decoy_active)
+        with prof.section("swap"): glutSwapBuffers()
+    prof.end_frame()
+    gls.end_frame()
+
+def draw_hud(world, cat, decoy_active):
     hud_begin(WINDOW_WIDTH, WINDOW_HEIGHT)
     r, g, b = hud_color_for_env(world.phase, world.weather)
     hud_text(10, WINDOW_HEIGHT - 20,
-             f"Phase:{world.phase}  Weather:{world.weather}  Score:{score}  Lives:{lives}",
+             f"Phase:{world.phase}  Weather:{world.weather}  Score:{state.score}  Lives:{state.lives}",
              r, g, b)
-    cd = max(0.0, MEOW_COOLDOWN_S - (time.time() - last_meow_at))
-    hud_text(10, WINDOW_HEIGHT - 40, f"Meow CD:{cd:.1f}s  Cheat:{'ON' if cheat_mode else 'OFF'}")
+    cd = state.meow_cooldown_left()
+    hud_text(10, WINDOW_HEIGHT - 40, f"Meow CD:{cd:.1f}s  Cheat:{'ON' if state.cheat_mode else 'OFF'}")
     hud_text(10, WINDOW_HEIGHT - 60,
-             "Move:WASD  Jump:Space  Meow:M  Decoy:T  Restart:R  Zoom:+/-  Yaw:1/2  Pitch:3/4",
+             "Move:WASD  Jump:Space  Meow:M  Decoy:T  Restart:R  Zoom:+/-  Yaw:1/2  Pitch:3/4  Pause:P  Profile:F/K  GL:G",
              0.0, 1.0, 0.0)
     hud_text(10, WINDOW_HEIGHT - 80,
              f"Cat x={cat.x:.0f} y={cat.y:.0f} yaw:{cat.yaw_deg:.0f}°  FPS:{fps_value:.1f}")
-    hud_text(10, WINDOW_HEIGHT - 100, f"Fish left: {fish_field.remaining()}")
+    hud_text(10, WINDOW_HEIGHT - 100, f"Fish left: {state.fish_field.remaining()}")
     if decoy_active:
         hud_text(WINDOW_WIDTH // 2 - 60, WINDOW_HEIGHT // 2 + 40, "DECOY ACTIVE")
-    if game_over:
+    if clock.paused:
+        hud_text(WINDOW_WIDTH * 0.5 - 40, WINDOW_HEIGHT * 0.5 + 60, "PAUSED  (P to resume)", 1.0, 1.0, 0.3)
+    if state.game_over:
         hud_text(WINDOW_WIDTH * 0.5 - 60, WINDOW_HEIGHT * 0.5 + 10, "GAME OVER", 1.0, 0.0, 0.0)
         hud_text(WINDOW_WIDTH * 0.5 - 120, WINDOW_HEIGHT * 0.5 - 10, "Press R to restart", 1.0, 0.2, 0.2)
+    if show_profile: draw_profile_overlay()
+    if gl_stats.enabled: draw_gl_stats_overlay()
     hud_end()
-    glutSwapBuffers()
+
+def draw_profile_overlay():
+    y = WINDOW_HEIGHT - 140
+    hud_text(10, y, f"{'stage':18s}   min     avg     p99  (ms, last {min(profiler.count, profiler.capacity)} frames)",
+             1.0, 1.0, 0.0)
+    for name, lo, avg, p99 in profiler.stats():
+        y -= 18
+        hud_text(10, y, f"{name:18s} {lo * 1e3:6.2f}  {avg * 1e3:6.2f}  {p99 * 1e3:6.2f}", 1.0, 1.0, 0.6)
+
+def draw_gl_stats_overlay():
+    # counts are from the previous complete frame
+    t = gl_stats.totals()
+    hud_text(10, WINDOW_HEIGHT - 120,
+             f"GL calls:{t['calls']}  draws:{t['draws']}  verts:{t['vertices']}  state:{t['state']}", 1.0, 0.8, 0.4)
+    x, y = WINDOW_WIDTH - 420, WINDOW_HEIGHT - 20
+    hud_text(x, y, f"{'section':8s} {'calls':>7s} {'draws':>6s} {'verts':>8s} {'state':>6s}", 1.0, 0.8, 0.4)
+    for name, c in sorted(gl_stats.last.items()):
+        y -= 18
+        hud_text(x, y, f"{name:8s} {c['calls']:7d} {c['draws']:6d} {c['vertices']:8d} {c['state']:6d}", 1.0, 0.9, 0.7)
+    y -= 18
+    hud_text(x, y, "LOD " + "  ".join(f"{k}:{'/'.join(map(str, v))}" for k, v in lod_counts.items()), 1.0, 0.8, 0.4)
+    y -= 18
+    hud_text(x, y, "Culled " + "  ".join(f"{k}:{v}" for k, v in cull_counts.items()), 1.0, 0.8, 0.4)
+
+def toggle_gl_stats():
+    if gl_stats.enabled:
+        gl_stats.uninstall(); return
+    gl_stats.install(globals())
+    # recompile display lists under the tracer so their vertices are known
+    for m in list(Model.live): m.release()
+
+def dump_profile():
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    profiler.dump_csv(f"profile-{stamp}.csv"); profiler.dump_json(f"profile-{stamp}.json")
+    print(f"Profile written to profile-{stamp}.csv / .json")
 
 def draw_ring(cx, cy, cz, r, segments=48):
     glBegin(GL_LINE_LOOP)
@@ -868,107 +1328,91 @@ def draw_ring(cx, cy, cz, r, segments=48):
         glVertex3f(cx + r * math.cos(th), cy + r * math.sin(th), cz)
     glEnd()
 
-def activate_double_score():
-    global double_score_until
-    double_score_until = time.time() + POWERUP_TIME_S
-
-def activate_speed_boost():
-    global speed_boost_until
-    speed_boost_until = time.time() + POWERUP_TIME_S
-
-# NEW: activate 10× scoring 
-def activate_score_x10():
-    global score_x10_until
-    score_x10_until = time.time() + POWERUP_TIME_S
-    print("Score x10 activated!")
-
 def update_timer():
-    global last_time, fps_accum, fps_frames, fps_value
-    global score, lives, cheat_mode, decoy, game_over, last_damage_time, double_score_until, speed_boost_until
-    global score_x10_until
+    """One frame of game updates; False when nothing changes until the next input."""
+    global fps_accum, fps_frames, fps_value, alpha
 
-    now = time.time()
-    if last_time is None: last_time = now
-    dt = min(0.1, max(0.0, now - last_time))
-    last_time = now
+    dt = clock.frame_dt()  # one wall-clock read per frame
 
-    if game_over:
-        glutPostRedisplay()
-        return
-
-    cat.step_mult = POWERUP_SPEED_MULT if now < speed_boost_until else 1.0
-
-    
-    mult = 10 if now < score_x10_until else (2 if now < double_score_until else 1)
-
-    world.update(dt)
-    cat.update(dt)
-    fish_field.update(dt)
-
-    target = (decoy["x"], decoy["y"]) if (decoy and decoy["expires"] > now) else (cat.x, cat.y)
-    dogs.ensure_count(DOG_COUNT)
-    dogs.update(dt, target)
-    if hasattr(dogs, "separate"): dogs.separate(dt)
-
-    for d in dogs.dogs:
-        if now >= d.steal_ready_at:
-            _ = fish_field.collect_if_close(d.x, d.y, FISH_PICKUP_RADIUS * DOG_STEAL_RADIUS_MULT)
-            d.steal_ready_at = now + random.uniform(*DOG_STEAL_INTERVAL_S)
-        if cat.jump_t >= 0.0:  
-            continue
-        if abs(cat.current_z() - d.z) > COLLISION_HEIGHT_TOL:
-            continue
-        if ((d.x - cat.x) ** 2 + (d.y - cat.y) ** 2) <= (DOG_RADIUS + CAT_BODY_R * 0.6) ** 2:
-            if (now - last_damage_time) >= HIT_IFRAMES_SEC and lives > 0:
-                lives -= 1; last_damage_time = now
-
-    if decoy and decoy["expires"] <= now:
-        decoy = None
-
-    pickup_r = FISH_PICKUP_RADIUS * (1.8 if cat.jump_t >= 0.0 else 1.0)
-    kinds = fish_field.collect_and_report(cat.x, cat.y, pickup_r)
-
-    
-    if kinds["gold"] > 0:
-        for _ in range(kinds["gold"]):
-            activate_score_x10()
-
-    score += mult * (
-        kinds["normal"] * SCORE_NORMAL
-        + kinds["fast"]   * SCORE_FAST
-        + kinds["timed"]  * SCORE_TIMED
-        + kinds["gold"]   * SCORE_GOLD
-    )
-
-    if cheat_mode:
-        fish_field.magnet_pull(cat.x, cat.y, CHEAT_BUBBLE_RADIUS, CHEAT_MAGNET_SPEED, dt)
+    # simulation runs at a fixed SIM_HZ; rendering interpolates between ticks
+    alpha = stepper.advance(dt, pending_inputs)
+    spawn_effects(state.events)
+    glutPostRedisplay()
+    # paused: queued inputs wait for the resume, so they don't keep frames coming
+    if clock.paused or (state.game_over and not pending_inputs):
+        return False
 
-    if fish_field.remaining() == 0: fish_field.spawn_random()
+    world_view.update(state.world, dt)
+    meow_fx.update(dt)
+    decoy_fx.update(dt)
 
-    fps_accum += dt; fps_frames += 1
+    fps_accum += clock.wall_dt; fps_frames += 1
     if fps_accum >= 0.5:
         fps_value = fps_frames / fps_accum
         fps_accum = 0.0; fps_frames = 0
-
-    if lives <= 0: game_over = True
-
-    glutPostRedisplay()
-
-
-
-def on_keyboard(key, x, y):
-    global cheat_mode, game_over
-    k = key.decode("utf-8") if isinstance(key, (bytes, bytearray)) else key
-
-    
-    if game_over and k not in ('r', 'R', '\x1b'): return
-
-    
-    if k == '\x1b':  
-        sys.exit(0)  
-
-   
-    elif k == '+':
+    return True
+
+
+class FrameScheduler:
+    """Calls frame() about `fps` times a second; sleeps until wake() once it returns False."""
+    def __init__(self, frame, fps=TARGET_FPS):
+        self.frame = frame
+        self.period = 1.0 / fps if fps > 0 else 0.0
+        self.deadline = 0.0
+        self.started = False
+        self.running = False
+
+    def start(self):
+        self.started = True
+        self.wake()
+
+    def wake(self):
+        if self.running or not self.started: return
+        self.running = True
+        clock.restart_wall()  # the time spent asleep is not simulated
+        self.deadline = time.perf_counter()
+        glutTimerFunc(0, self._tick, 0)
+
+    def _tick(self, _value):
+        if not self.frame():
+            self.running = False
+            return
+        now = time.perf_counter()
+        # due a period after the last deadline; a frame a period late restarts the schedule
+        self.deadline += self.period
+        if now - self.deadline > self.period: self.deadline = now
+        glutTimerFunc(max(0, int((self.deadline - now) * 1000.0)), self._tick, 0)
+
+
+def set_swap_interval(interval):
+    """Best-effort vsync control for the current context; True if the driver took it."""
+    try:
+        if sys.platform == "win32":
+            from OpenGL.WGL.EXT.swap_control import wglSwapIntervalEXT
+            return bool(wglSwapIntervalEXT) and bool(wglSwapIntervalEXT(interval))
+        from OpenGL.GLX import glXGetCurrentDisplay, glXGetCurrentDrawable
+        from OpenGL.GLX.EXT.swap_control import glXSwapIntervalEXT
+        from OpenGL.GLX.MESA.swap_control import glXSwapIntervalMESA
+        if bool(glXSwapIntervalEXT):
+            glXSwapIntervalEXT(glXGetCurrentDisplay(), glXGetCurrentDrawable(), interval)
+            return True
+        if bool(glXSwapIntervalMESA): return glXSwapIntervalMESA(interval) == 0
+    except Exception:
+        pass  # no swap control on this platform/driver; frames are paced by the scheduler alone
+    return False
+
+
+scheduler = FrameScheduler(update_timer)
+
+
+KEY_ACTIONS = {
+    'w': "forward", 's': "backward", 'a': "left", 'd': "right",  # Cat movement controls
+    ' ': "jump", 'c': "cheat", 'm': "meow", 't': "decoy", 'r': "restart",  # Jump and special actions
+}
+
+def camera_key(k):
+    """Applies a camera key (+ - 1 2 3 4); False for any other key."""
+    if k == '+':
         cam.distance = max(100.0, cam.distance - 30.0)
     elif k == '-':
         cam.distance = min(2000.0, cam.distance + 30.0)
@@ -980,44 +1424,73 @@ def on_keyboard(key, x, y):
         cam.pitch_deg = max(10.0, cam.pitch_deg - 3.0)
     elif k == '4':
         cam.pitch_deg = min(85.0, cam.pitch_deg + 3.0)
+    else:
+        return False
+    return True
 
-    # Cat movement controls
-    elif k in ('w', 'W'):
-        cat.move_forward()
-    elif k in ('s', 'S'):
-        cat.move_backward()
-    elif k in ('a', 'A'):
-        cat.rotate_left()
-    elif k in ('d', 'D'):
-        cat.rotate_right()
+def on_keyboard(key, x, y):
+    global show_profile
+    k = key.decode("utf-8") if isinstance(key, (bytes, bytearray)) else key
+    scheduler.wake()
+
+    # Profiling keys work at any time, including on the game over screen
+    if k in ('f', 'F'):
+        show_profile = not show_profile; return
+    if k in ('k', 'K'):
+        dump_profile(); return
+    if k in ('g', 'G'):
+        toggle_gl_stats(); return
+    if k in ('p', 'P'):
+        clock.paused = not clock.paused; return
 
-    # Jump and special actions
-    elif k == ' ':
-        cat.start_jump()
-    elif k in ('c', 'C'):
-        cheat_mode = not cheat_mode  
-    elif k in ('m', 'M'):
-        do_meow()  
-    elif k in ('t', 'T'):
-        drop_decoy()  # Drop a decoy
-    elif k in ('r', 'R'):
-        reset_game()  # Reset the game
+    
+    if state.game_over and k not in ('r', 'R', '\x1b'): return
 
+    
+    if k == '\x1b':  
+        sys.exit(0)  
 
+    elif camera_key(k): pass
 
+    # Gameplay keys are applied on the next simulation step (not while paused)
+    elif k.lower() in KEY_ACTIONS and not clock.paused:
+        pending_inputs.append(KEY_ACTIONS[k.lower()])
 
 
+
+
+
+def save_recording(recorder, path):
+    recorder.save(path)
+    print(f"Recording saved to {path} ({recorder.state.ticks} ticks, score {recorder.state.score})")
+
 def main():
+    global state, stepper, clock
+    ap = argparse.ArgumentParser(description="Meowgic Catch")
+    ap.add_argument("--seed", type=int, help="seed for a reproducible round")
+    ap.add_argument("--record", metavar="PATH", help="record inputs for Replay.py, saved on exit")
+    args, _ = ap.parse_known_args()
+    if args.seed is not None:
+        # on a fresh clock: the discarded state's world timers stay on the old one
+        clock = GameClock(clock.mode, clock.scale)
+        state = GameState(clock, profiler, args.seed)
+        stepper = FixedStepper(state)
+    if args.record:
+        atexit.register(save_recording, Recorder(state), args.record)
+
     glutInit(sys.argv)
     glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGBA | GLUT_DEPTH)
     glutInitWindowSize(WINDOW_WIDTH, WINDOW_HEIGHT)
     glutInitWindowPosition(100, 100)
     glutCreateWindow(WINDOW_TITLE.encode("utf-8"))
-    init_gl(); reset_game()
+    init_gl()
     glutDisplayFunc(display)
     
     glutKeyboardFunc(on_keyboard)
-    glutIdleFunc(update_timer)   
+    if VSYNC: set_swap_interval(1)
+    scheduler.start()
+    if bool(glutSetOption):  # freeglut: return from the main loop on close so exit handlers run
+        glutSetOption(GLUT_ACTION_ON_WINDOW_CLOSE, GLUT_ACTION_GLUTMAINLOOP_RETURNS)
     glutMainLoop()
 
 if __name__ == "__main__":
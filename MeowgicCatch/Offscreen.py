@@ -0,0 +1,221 @@
+# Off-screen rendering: runs Game.display() into a framebuffer object on a
+# window-less OpenGL context (EGL, e.g. Mesa's llvmpipe on a surfaceless
+# display, or OSMesa), so render cost can be measured and frames captured on
+# machines without a display.
+#
+#   python Offscreen.py                             render 600 frames, print frame times
+#   python Offscreen.py --capture frames --every 60 also write frames/frame_00060.png, ...
+#   python Offscreen.py --replay run.json.gz        render a recorded session
+#   python Offscreen.py --json render.json --baseline old.json
+#
+# The HUD is not drawn: it uses GLUT bitmap fonts, which need a GLUT window.
+import os, sys, time, json, zlib, struct, ctypes, argparse
+
+# must be decided before anything imports OpenGL
+os.environ.setdefault("PYOPENGL_PLATFORM", "osmesa" if "--osmesa" in sys.argv else "egl")
+
+import numpy as np
+from OpenGL.GL import *
+import Simulation as S
+
+OFFSCREEN_FRAMES = 600
+OFFSCREEN_FRAME_DT = 1.0 / 60.0  # simulated time between rendered frames
+EGL_PLATFORM_SURFACELESS_MESA = 0x31DD
+
+
+def _egl_context():
+    from OpenGL import EGL
+    display = None
+    try:
+        from OpenGL.EGL.EXT.platform_base import eglGetPlatformDisplayEXT
+        display = eglGetPlatformDisplayEXT(EGL_PLATFORM_SURFACELESS_MESA, EGL.EGL_DEFAULT_DISPLAY, None)
+    except Exception:
+        pass  # no EGL_EXT_platform_base; use the default display
+    if not display: display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+    if not display or not EGL.eglInitialize(display, None, None):
+        raise RuntimeError("no EGL display")
+    EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+    # Mesa supports contexts without a config or surface (EGL_KHR_no_config_context,
+    # EGL_KHR_surfaceless_context); otherwise make a 1x1 pbuffer to bind with.
+    surface = EGL.EGL_NO_SURFACE
+    ctx = EGL.eglCreateContext(display, None, EGL.EGL_NO_CONTEXT, None)
+    if not ctx:
+        attribs = (EGL.EGLint * 5)(EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+                                   EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT, EGL.EGL_NONE)
+        config, count = EGL.EGLConfig(), EGL.EGLint()
+        if not EGL.eglChooseConfig(display, attribs, ctypes.pointer(config), 1, ctypes.pointer(count)) or not count.value:
+            raise RuntimeError("no EGL config for desktop OpenGL")
+        surface = EGL.eglCreatePbufferSurface(display, config, (EGL.EGLint * 5)(
+            EGL.EGL_WIDTH, 1, EGL.EGL_HEIGHT, 1, EGL.EGL_NONE))
+        ctx = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, None)
+    if not ctx or not EGL.eglMakeCurrent(display, surface, surface, ctx):
+        raise RuntimeError("could not make an EGL context current")
+    return display, ctx
+
+
+def _osmesa_context(width, height):
+    from OpenGL import osmesa, arrays
+    ctx = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+    buf = arrays.GLubyteArray.zeros((height, width, 4))
+    if not ctx or not osmesa.OSMesaMakeCurrent(ctx, buf, GL_UNSIGNED_BYTE, width, height):
+        raise RuntimeError("could not make an OSMesa context current")
+    return ctx, buf
+
+
+class OffscreenTarget:
+    """A window-less GL context with a width x height color + depth FBO bound."""
+    def __init__(self, width, height):
+        self.width, self.height = width, height
+        if os.environ["PYOPENGL_PLATFORM"] == "osmesa":
+            self.context = _osmesa_context(width, height)
+        else:
+            self.context = _egl_context()
+        self.fbo = glGenFramebuffers(1)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        self.color, self.depth = glGenRenderbuffers(2)
+        glBindRenderbuffer(GL_RENDERBUFFER, self.color)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, width, height)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, self.color)
+        glBindRenderbuffer(GL_RENDERBUFFER, self.depth)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH24_STENCIL8, width, height)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_STENCIL_ATTACHMENT, GL_RENDERBUFFER, self.depth)
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError("off-screen framebuffer is incomplete")
+        glViewport(0, 0, width, height)
+
+    def renderer(self):
+        return f"{glGetString(GL_RENDERER).decode()} ({glGetString(GL_VERSION).decode()})"
+
+    def pixels(self):
+        """The framebuffer as a (height, width, 4) uint8 array, top row first."""
+        data = glReadPixels(0, 0, self.width, self.height, GL_RGBA, GL_UNSIGNED_BYTE)
+        return np.frombuffer(bytes(data), np.uint8).reshape(self.height, self.width, 4)[::-1]
+
+    def save_png(self, path):
+        write_png(path, self.pixels())
+
+
+def write_png(path, rgba):
+    """Minimal RGBA PNG writer (no image library needed)."""
+    h, w, _ = rgba.shape
+    raw = np.hstack((np.zeros((h, 1), np.uint8), rgba.reshape(h, w * 4))).tobytes()
+    def chunk(tag, body):
+        return struct.pack(">I", len(body)) + tag + body + struct.pack(">I", zlib.crc32(tag + body) & 0xffffffff)
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 6, 0, 0, 0))
+                + chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b""))
+
+
+def start(width=None, height=None):
+    """Makes an off-screen target current and sets Game up to draw into it."""
+    import Game
+    target = OffscreenTarget(width or Game.WINDOW_WIDTH, height or Game.WINDOW_HEIGHT)
+    Game.offscreen = True
+    Game.cam.resize(target.width, target.height)
+    Game.init_gl()
+    return target
+
+
+def frames_from_state(state, count):
+    """Steps a live GameState one OFFSCREEN_FRAME_DT per frame."""
+    import Game
+    stepper = S.FixedStepper(state)
+    for _ in range(count):
+        Game.alpha = stepper.advance(OFFSCREEN_FRAME_DT, Game.pending_inputs)
+        yield OFFSCREEN_FRAME_DT
+
+
+def frames_from_replay(doc, ticks_per_frame, count):
+    """Steps a recording ticks_per_frame ticks per frame, until it ends."""
+    import Game, Replay
+    steps = Replay.replay_ticks(doc, Game.profiler)
+    Game.state = next(steps)
+    Game.sync_sim_config()  # draw with the recorded config
+    Game.alpha = 1.0
+    for _ in range(count):
+        for _ in range(ticks_per_frame):
+            if next(steps, None) is None: return
+        yield doc["dt"] * ticks_per_frame
+
+
+def render(target, frames, capture=None, every=1):
+    """Draws one Game.display() per simulated frame; returns per-frame seconds."""
+    import Game
+    times = []
+    for i, dt in enumerate(frames):
+        state = Game.state
+        Game.spawn_effects(state.events)
+        Game.world_view.update(state.world, dt)
+        Game.meow_fx.update(dt); Game.decoy_fx.update(dt)
+        t = time.perf_counter()
+        Game.display()  # ends with glFinish when off-screen
+        times.append(time.perf_counter() - t)
+        if capture and i % every == 0:
+            target.save_png(os.path.join(capture, f"frame_{i:05d}.png"))
+    return times
+
+
+def summary(times):
+    t = np.array(times)
+    return {"median": float(np.median(t)), "min": float(t.min()), "mean": float(t.mean()),
+            "p95": float(np.percentile(t, 95)), "p99": float(np.percentile(t, 99)), "max": float(t.max()),
+            "frames": len(t)}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Render Meowgic Catch off-screen and time it")
+    ap.add_argument("--frames", type=int, default=OFFSCREEN_FRAMES)
+    ap.add_argument("--warmup", type=int, default=10, help="untimed frames first (display lists, shaders)")
+    ap.add_argument("--size", default=None, metavar="WxH", help="framebuffer size (default: the window size)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--replay", metavar="PATH", help="render a Replay.py recording instead of an idle round")
+    ap.add_argument("--ticks-per-frame", type=int, default=2, help="recorded ticks per frame with --replay")
+    ap.add_argument("--capture", metavar="DIR", help="write frames as PNGs into DIR")
+    ap.add_argument("--every", type=int, default=1, help="capture every Nth frame")
+    ap.add_argument("--json", help="write frame and stage times (Benchmark.py format)")
+    ap.add_argument("--baseline", help="Benchmark.py-format JSON to compare against")
+    ap.add_argument("--osmesa", action="store_true", help="use OSMesa instead of EGL")
+    args = ap.parse_args(argv)
+
+    import Game
+    w, h = map(int, args.size.lower().split("x")) if args.size else (None, None)
+    target = start(w, h)
+    if args.capture: os.makedirs(args.capture, exist_ok=True)
+    print(f"rendering {target.width}x{target.height} on {target.renderer()}")
+
+    if args.replay:
+        import Replay
+        frames = frames_from_replay(Replay.load(args.replay), max(1, args.ticks_per_frame), args.warmup + args.frames)
+    else:
+        Game.state = S.GameState(S.GameClock(), Game.profiler, seed=args.seed)
+        frames = frames_from_state(Game.state, args.warmup + args.frames)
+    warm = [dt for _, dt in zip(range(args.warmup), frames)]
+    render(target, warm)
+    Game.profiler.reset()  # stage stats over the timed frames only
+    times = render(target, frames, args.capture, max(1, args.every))
+    if not times: raise SystemExit("nothing to render")
+
+    results = {"render.frame": summary(times)}
+    for name, lo, avg, p99 in Game.profiler.stats():
+        if (name.startswith("draw.") or name == "swap") and avg > 0.0:
+            results[f"render.{name}"] = {"median": avg, "min": lo, "mean": avg, "p99": p99}
+    r = results["render.frame"]
+    print(f"{r['frames']} frames: median {r['median'] * 1e3:.2f} ms, mean {r['mean'] * 1e3:.2f} ms, "
+          f"p95 {r['p95'] * 1e3:.2f} ms, p99 {r['p99'] * 1e3:.2f} ms ({1.0 / r['mean']:.0f} fps)")
+    for name, s in results.items():
+        if name != "render.frame": print(f"  {name:24s} avg {s['mean'] * 1e3:7.3f} ms  p99 {s['p99'] * 1e3:7.3f} ms")
+
+    if args.json:
+        doc = {"meta": {"renderer": target.renderer(), "size": [target.width, target.height],
+                        "python": sys.version.split()[0], "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+               "results": results}
+        with open(args.json, "w") as f: json.dump(doc, f, indent=2)
+    if args.baseline:
+        import Benchmark
+        with open(args.baseline) as f: baseline = json.load(f)["results"]
+        if Benchmark.compare(results, baseline): return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
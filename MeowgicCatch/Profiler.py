@@ -0,0 +1,96 @@
+# Per-frame stage profiler: each stage's time per frame goes into a fixed-size
+# ring buffer, so simulation and rendering costs can be told apart.
+# No OpenGL in here; Game.py draws the overlay and GameState times its own stages.
+import time, json
+import numpy as np
+
+PROFILE_FRAMES = 600  # ring buffer length (frames)
+PROFILE_STAGES = (
+    "sim.timers", "sim.cat", "sim.fish", "sim.dogs.update", "sim.dogs.separate", "sim.collisions",
+    "draw.world", "draw.fish", "draw.dogs", "draw.cat", "draw.hud", "swap",
+)
+
+
+class _Section:
+    __slots__ = ("prof", "col", "t")
+    def __init__(self, prof, col):
+        self.prof, self.col = prof, col
+    def __enter__(self):
+        self.t = time.perf_counter()
+    def __exit__(self, *exc):
+        self.prof.current[self.col] += time.perf_counter() - self.t
+
+
+class _NoSection:
+    def __enter__(self): pass
+    def __exit__(self, *exc): pass
+
+_NO_SECTION = _NoSection()
+
+
+class Profiler:
+    """Times named stages with `with prof.section(name):`. Times add up until
+    end_frame() stores them (plus the whole frame time) as one ring-buffer row.
+    A disabled profiler's sections do nothing."""
+    def __init__(self, capacity=PROFILE_FRAMES, enabled=True):
+        self.enabled = enabled
+        self.capacity = capacity
+        self.stages = list(PROFILE_STAGES) + ["frame"]
+        self.frame_col = len(PROFILE_STAGES)
+        self.buf = np.zeros((capacity, len(self.stages)))
+        self.current = [0.0] * len(self.stages)
+        self.sections = {}
+        self.count = 0  # frames recorded so far
+        self.last_frame_at = None
+
+    def section(self, name):
+        if not self.enabled: return _NO_SECTION
+        s = self.sections.get(name)
+        if s is None:
+            if name not in self.stages:
+                self.stages.append(name); self.current.append(0.0)
+                self.buf = np.hstack((self.buf, np.zeros((self.capacity, 1))))
+            s = self.sections[name] = _Section(self, self.stages.index(name))
+        return s
+
+    def reset(self):
+        """Drops the recorded frames."""
+        self.count = 0
+        self.last_frame_at = None
+        self.current = [0.0] * len(self.stages)
+
+    def end_frame(self):
+        if not self.enabled: return
+        now = time.perf_counter()
+        if self.last_frame_at is not None:
+            self.current[self.frame_col] = now - self.last_frame_at
+        self.last_frame_at = now
+        self.buf[self.count % self.capacity] = self.current
+        self.count += 1
+        self.current = [0.0] * len(self.stages)
+
+    def frames(self):
+        """Recorded rows, oldest first."""
+        n = min(self.count, self.capacity)
+        if self.count <= self.capacity: return self.buf[:n]
+        k = self.count % self.capacity
+        return np.vstack((self.buf[k:], self.buf[:k]))
+
+    def stats(self):
+        """[(stage, min, avg, p99)] in seconds over the buffered frames."""
+        rows = self.frames()
+        if len(rows) == 0: return []
+        lo, avg, p99 = rows.min(0), rows.mean(0), np.percentile(rows, 99, axis=0)
+        return [(name, lo[i], avg[i], p99[i]) for i, name in enumerate(self.stages)]
+
+    def dump_csv(self, path):
+        rows = self.frames()
+        with open(path, "w") as f:
+            f.write(",".join(self.stages) + "\n")
+            for r in rows: f.write(",".join(f"{v:.9f}" for v in r) + "\n")
+
+    def dump_json(self, path):
+        doc = {"stages": self.stages,
+               "frames": self.frames().tolist(),
+               "summary": {name: {"min": lo, "avg": avg, "p99": p99} for name, lo, avg, p99 in self.stats()}}
+        with open(path, "w") as f: json.dump(doc, f)
@@ -0,0 +1,215 @@
+# Deterministic input recording and replay for Meowgic Catch.
+#
+#   python Game.py --record run.json.gz          play, save the recording on exit
+#   python Replay.py run.json.gz                 re-run headless as fast as possible
+#   python Replay.py run.json.gz --render        re-run in a window, one frame per tick
+#   python Replay.py --check                     record and replay a round under CHECK_CONFIG
+#
+# A recording holds the GameState seed, the Simulation TUNABLES and every
+# non-empty input batch keyed by the tick it was applied on. The simulation
+# draws all of its randomness from the seeded state and advances in fixed
+# ticks, so replaying the same inputs on the same ticks gives the same round;
+# the replay checks the final score and lives against the recorded ones.
+import sys, os, gzip, json, time, random, argparse, contextlib
+import Simulation as S
+
+REPLAY_VERSION = 1
+
+# Non-default config for --check, so it also catches settings a replay fails to apply
+CHECK_CONFIG = {"FISH_COUNT": 40, "DOG_COUNT": 10, "DOG_RADIUS": 30.0, "START_LIVES": 1000,
+                "ARENA_OBSTACLES": [[2, iy] for iy in range(-6, 7)] + [[-4, 3], [-3, 3]]}
+
+
+class Recorder:
+    """Logs the inputs of `state` from its first tick; attach before stepping."""
+    def __init__(self, state):
+        if state.ticks: raise ValueError("attach the recorder before the first step")
+        self.state = state
+        self.config = S.config_snapshot()
+        self.inputs = []  # [tick, action, ...]
+        state.recorder = self
+
+    def record(self, tick, inputs):
+        self.inputs.append([tick, *inputs])
+
+    def document(self):
+        st = self.state
+        return {"version": REPLAY_VERSION, "seed": st.seed, "dt": S.SIM_DT, "config": self.config,
+                "ticks": st.ticks, "final": {"score": st.score, "lives": st.lives},
+                "inputs": self.inputs}
+
+    def save(self, path):
+        with gzip.open(path, "wt") as f:
+            json.dump(self.document(), f, separators=(",", ":"))
+
+
+def load(path):
+    with gzip.open(path, "rt") as f: doc = json.load(f)
+    if doc.get("version") != REPLAY_VERSION:
+        raise ValueError(f"{path}: unsupported replay version {doc.get('version')}")
+    return doc
+
+
+def replay_ticks(doc, profiler=None):
+    """Generator: a fresh GameState for the recording, stepped through the
+    recorded ticks one at a time; yields the state before the first tick and
+    after every tick. The recorded config is in effect until the generator
+    finishes or is closed."""
+    saved = S.config_snapshot()
+    S.apply_config(doc["config"])
+    try:
+        state = S.GameState(S.GameClock(), profiler, seed=doc["seed"])
+        inputs = iter(doc["inputs"])
+        nxt = next(inputs, None)
+        dt = doc["dt"]
+        yield state
+        for tick in range(doc["ticks"]):
+            actions = ()
+            if nxt is not None and nxt[0] == tick:
+                actions = nxt[1:]
+                nxt = next(inputs, None)
+            state.step(dt, actions)
+            yield state
+    finally:
+        S.apply_config(saved)
+
+
+def replay(doc):
+    """Runs the whole recording headless; returns the final GameState."""
+    state = None
+    for state in replay_ticks(doc): pass
+    return state
+
+
+def mismatches(doc, state):
+    """["score: recorded 12, replayed 10", ...] for final values that differ."""
+    got = {"score": state.score, "lives": state.lives}
+    return [f"{k}: recorded {v}, replayed {got[k]}" for k, v in doc["final"].items() if got.get(k) != v]
+
+
+def fingerprint(state):
+    """End-of-round values a deterministic replay must reproduce exactly."""
+    cat = state.cat
+    return {"score": state.score, "lives": state.lives, "fish_stolen": state.fish_stolen,
+            "fish_left": state.fish_field.remaining(), "cat": [cat.x, cat.y],
+            "weather": state.world.weather, "phase": state.world.phase,
+            "obstacles": not state.dogs.flow.open}
+
+
+def built_with(state):
+    """Config values as a fresh GameState actually picked them up, so a
+    setting the objects never read (a default bound at import) shows up."""
+    dogs = state.dogs
+    return {"FISH_COUNT": state.fish_field.remaining(),
+            "DOG_COUNT": len(dogs.dogs) if hasattr(dogs, "dogs") else len(dogs),
+            "ARENA_OBSTACLES": int(dogs.flow.blocked.sum())}
+
+
+def check(config=CHECK_CONFIG, seed=1, ticks=12000):
+    """Records a round of random inputs under `config`, then replays the
+    recording (round-tripped through JSON) with the current config back in
+    place; returns the fingerprint fields that differ, and any setting the
+    replayed state was not built with."""
+    saved = S.config_snapshot()
+    S.apply_config(config)
+    try:
+        state = S.GameState(S.GameClock(), seed=seed)
+        rec = Recorder(state)
+        ui = random.Random(seed)
+        for _ in range(ticks):
+            state.step(S.SIM_DT, (ui.choice(S.INPUT_ACTIONS[:-1]),) if ui.random() < 0.05 else ())
+        doc = json.loads(json.dumps(rec.document()))
+        want = fingerprint(state)
+    finally:
+        S.apply_config(saved)
+    steps = replay_ticks(doc)
+    state = next(steps)
+    cfg = doc["config"]
+    expect = {"FISH_COUNT": cfg["FISH_COUNT"], "DOG_COUNT": cfg["DOG_COUNT"],
+              "ARENA_OBSTACLES": len({tuple(c) for c in cfg["ARENA_OBSTACLES"]})}
+    built = built_with(state)
+    bad = [f"{k}: config {v}, replay built with {built[k]}" for k, v in expect.items() if built[k] != v]
+    for state in steps: pass
+    got = fingerprint(state)
+    return bad + [f"{k}: recorded {v}, replayed {got[k]}" for k, v in want.items() if got[k] != v]
+
+
+def report(doc, state, elapsed):
+    ticks = doc["ticks"]
+    print(f"{ticks} ticks ({ticks * doc['dt']:.1f}s of play) in {elapsed:.2f}s, "
+          f"{ticks / max(elapsed, 1e-9):.0f} ticks/s; score {state.score}, lives {state.lives}")
+    bad = mismatches(doc, state)
+    for m in bad: print("MISMATCH", m)
+    if not bad: print("replay matches the recording")
+    return 1 if bad else 0
+
+
+def render(doc, ticks_per_frame=1):
+    """Replays in a GLUT window through Game.display, as fast as frames render."""
+    import Game
+    Game.glutInit(sys.argv)
+    Game.glutInitDisplayMode(Game.GLUT_DOUBLE | Game.GLUT_RGBA | Game.GLUT_DEPTH)
+    Game.glutInitWindowSize(Game.WINDOW_WIDTH, Game.WINDOW_HEIGHT)
+    Game.glutCreateWindow(b"Meowgic Catch replay")
+    Game.init_gl()
+    steps = replay_ticks(doc, Game.profiler)
+    Game.state = next(steps)
+    Game.sync_sim_config()  # draw with the recorded config
+    Game.alpha = 1.0
+    started = time.perf_counter()
+
+    def idle():
+        state = Game.state
+        for _ in range(ticks_per_frame):
+            state = next(steps, None)
+            if state is None:
+                sys.exit(report(doc, Game.state, time.perf_counter() - started))
+            Game.spawn_effects(state.events)
+        frame_dt = doc["dt"] * ticks_per_frame
+        Game.world_view.update(state.world, frame_dt)
+        Game.meow_fx.update(frame_dt); Game.decoy_fx.update(frame_dt)
+        Game.glutPostRedisplay()
+
+    def keyboard(key, x, y):
+        # camera keys only: gameplay keys would go to Game's own (hidden) round
+        k = key.decode("utf-8") if isinstance(key, (bytes, bytearray)) else key
+        if k == '\x1b': sys.exit(report(doc, Game.state, time.perf_counter() - started))
+        Game.camera_key(k)
+
+    Game.glutDisplayFunc(Game.display)
+    Game.glutKeyboardFunc(keyboard)
+    Game.glutIdleFunc(idle)
+    Game.glutMainLoop()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Replay a Meowgic Catch recording")
+    ap.add_argument("path", nargs="?")
+    ap.add_argument("--check", action="store_true", help="record and replay a round under CHECK_CONFIG")
+    ap.add_argument("--render", action="store_true", help="draw every replayed tick in a window")
+    ap.add_argument("--ticks-per-frame", type=int, default=1, help="ticks simulated per rendered frame")
+    ap.add_argument("--verbose", action="store_true", help="keep the simulation's gameplay messages")
+    args = ap.parse_args(argv)
+
+    if args.check:
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            bad = check()
+        for m in bad: print("MISMATCH", m)
+        if not bad: print("replay under a non-default config matches")
+        return 1 if bad else 0
+    if args.path is None: ap.error("a recording path (or --check) is required")
+    doc = load(args.path)
+    if args.render:
+        render(doc, max(1, args.ticks_per_frame))
+        return 0
+    with contextlib.ExitStack() as quiet:
+        if not args.verbose:
+            quiet.enter_context(contextlib.redirect_stdout(quiet.enter_context(open(os.devnull, "w"))))
+        t = time.perf_counter()
+        state = replay(doc)
+        elapsed = time.perf_counter() - t
+    return report(doc, state, elapsed)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1063 @@
+import time, math, random, heapq, itertools
+from math import radians
+from bisect import bisect_right
+from collections import OrderedDict, deque
+import numpy as np
+from Profiler import Profiler
+
+# Headless game core: world, cat, fish, dogs, collisions, scoring and power-ups.
+# Nothing in here touches OpenGL, so a GameState can be stepped thousands of
+# times per second on servers without a display. Game.py renders it.
+
+#CONFIG
+#Dynamic Environment: grid/floor used by time-of-day
+CELL_SIZE = 60.0
+GRID_HALF_CELLS = 8
+# Large-world mode: a (2 * LARGE_WORLD_HALF_CELLS + 1)^2 cell arena instead of
+# 17x17; the renderer follows the cat and only builds the floor it can see.
+LARGE_WORLD = False
+LARGE_WORLD_HALF_CELLS = 256
+
+# Cat & Dog collision
+COLLISION_HEIGHT_TOL = 25.0
+HIT_IFRAMES_SEC = 0.6
+
+# Dynamic Environment: phases of day
+TIME_OF_DAY_DURATION_SEC = 30.0
+
+# Cat [Player Body, Player Movement/Jump]
+CAT_BODY_R = 40.0
+CAT_Z_OFFSET = 30.0
+
+#  Cat jump parameters [Jump Action]
+CAT_JUMP_HEIGHT = 80.0
+CAT_JUMP_DURATION = 0.6
+CAT_JUMP_COOLDOWN = 0.2
+
+#Fish (random spawn + behaviors/scoring types)
+FISH_COUNT = 17
+FISH_BODY_R = 12.0
+FISH_PICKUP_RADIUS = 36.0
+FISH_Z = 25.0
+FISH_TAIL_SWING_DEG_S = 300.0
+
+# spawn weights
+FISH_PROB_NORMAL = 0.55
+FISH_PROB_FAST = 0.25
+FISH_PROB_TIMED = 0.17
+FISH_PROB_GOLD = 0.03
+
+
+FISH_FAST_SPEED = 220.0
+FISH_TIMED_TTL_S = (4.0, 7.0)
+
+# "objects": one Fish per fish (FishField); "numpy": struct-of-arrays (ArrayFishField)
+FISH_BACKEND = "objects"
+FISH_KINDS = ("normal", "fast", "timed", "gold")
+
+# Powerups & scoring
+POWERUP_TIME_S = 10.0
+POWERUP_SPEED_MULT = 1.6
+SCORE_NORMAL = 1
+SCORE_FAST = 2
+SCORE_TIMED = 2
+SCORE_GOLD = 3
+
+# Dogs (antagonist) and their health & steal mechanics
+DOG_RADIUS = 20.0
+DOG_SPEED = 70.0
+START_LIVES = 5
+
+DOG_COUNT = 6
+DOG_STEAL_INTERVAL_S = (0.6, 1.5)
+DOG_STEAL_RADIUS_MULT = 0.8
+DOG_Z = 25.0
+# "objects": one Dog per dog (DogPack); "numpy": struct-of-arrays (ArrayDogPack)
+DOG_BACKEND = "objects"
+
+# Floor cells (ix, iy) that dogs path around; cell ix spans [ix, ix + 1) * CELL_SIZE.
+# Dogs follow a flow field toward their target, so these can be any shape.
+ARENA_OBSTACLES = ()
+# Dog pathfinding fields cover at most this many cells each side of the target
+# cell (dogs farther out head straight for the target); at most FLOW_CACHE_FIELDS
+# fields are kept, the least recently used dropped first.
+FLOW_WINDOW_HALF_CELLS = 32
+FLOW_CACHE_FIELDS = 32
+
+# Meow stun
+MEOW_RANGE = 140.0
+MEOW_STUN_SEC = 2.0
+MEOW_COOLDOWN_S = 6.0
+
+# Decoy
+DECOY_LIFETIME = 5.0
+DECOY_RADIUS = 10.0
+
+#Cheat Bubble Mode (auto-collect nearby Cat while in cheat mode)
+CHEAT_BUBBLE_RADIUS = 120.0
+CHEAT_MAGNET_SPEED  = 240.0
+
+# Fixed-timestep simulation: the sim always advances in SIM_DT ticks, whatever
+# the frame rate; wall-clock frames longer than MAX_FRAME_DT drop the backlog.
+SIM_HZ = 120.0
+SIM_DT = 1.0 / SIM_HZ
+MAX_FRAME_DT = 0.25
+
+# Actions accepted by GameState.step
+INPUT_ACTIONS = ("forward", "backward", "left", "right", "jump", "meow", "decoy", "cheat", "restart")
+
+# Config that changes how a round plays out; recordings store these so a replay
+# runs under the settings it was recorded with.
+TUNABLES = (
+    "CELL_SIZE", "GRID_HALF_CELLS", "LARGE_WORLD", "LARGE_WORLD_HALF_CELLS", "COLLISION_HEIGHT_TOL", "HIT_IFRAMES_SEC", "TIME_OF_DAY_DURATION_SEC",
+    "CAT_BODY_R", "CAT_Z_OFFSET", "CAT_JUMP_HEIGHT", "CAT_JUMP_DURATION", "CAT_JUMP_COOLDOWN",
+    "FISH_COUNT", "FISH_BODY_R", "FISH_PICKUP_RADIUS", "FISH_Z", "FISH_TAIL_SWING_DEG_S",
+    "FISH_PROB_NORMAL", "FISH_PROB_FAST", "FISH_PROB_TIMED", "FISH_PROB_GOLD",
+    "FISH_FAST_SPEED", "FISH_TIMED_TTL_S", "FISH_BACKEND",
+    "POWERUP_TIME_S", "POWERUP_SPEED_MULT", "SCORE_NORMAL", "SCORE_FAST", "SCORE_TIMED", "SCORE_GOLD",
+    "DOG_RADIUS", "DOG_SPEED", "START_LIVES", "DOG_COUNT", "DOG_STEAL_INTERVAL_S", "DOG_STEAL_RADIUS_MULT",
+    "DOG_Z", "DOG_BACKEND", "ARENA_OBSTACLES", "FLOW_WINDOW_HALF_CELLS",
+    "MEOW_RANGE", "MEOW_STUN_SEC", "MEOW_COOLDOWN_S", "DECOY_LIFETIME", "DECOY_RADIUS",
+    "CHEAT_BUBBLE_RADIUS", "CHEAT_MAGNET_SPEED",
+)
+
+def config_snapshot():
+    """The current TUNABLES as a JSON-friendly dict."""
+    g = globals()
+    return {name: list(map(list, g[name])) if name == "ARENA_OBSTACLES" else
+            list(g[name]) if isinstance(g[name], tuple) else g[name] for name in TUNABLES}
+
+def apply_config(cfg):
+    """Sets the TUNABLES found in `cfg` (e.g. a config_snapshot())."""
+    g = globals()
+    for name, value in cfg.items():
+        if name not in TUNABLES: continue
+        if name == "ARENA_OBSTACLES": value = tuple(tuple(c) for c in value)
+        elif isinstance(value, list): value = tuple(value)
+        g[name] = value
+
+
+def grid_half_cells():
+    """Cells from the centre cell to the arena edge, as currently configured."""
+    return LARGE_WORLD_HALF_CELLS if LARGE_WORLD else GRID_HALF_CELLS
+
+def _cell_pairs(ax, ay, bx, by, cell):
+    """Index pairs (i, j) of points a[i], b[j] in the same or adjacent `cell`-sized grid cells."""
+    ka = (np.floor(ax / cell).astype(np.int64) << 32) + np.floor(ay / cell).astype(np.int64)
+    kb = (np.floor(bx / cell).astype(np.int64) << 32) + np.floor(by / cell).astype(np.int64)
+    order = np.argsort(kb, kind="stable"); sk = kb[order]
+    # searching with sorted keys is several times faster; results go back to a's order
+    qa = np.argsort(ka, kind="stable"); qk = ka[qa]
+    idx = np.arange(len(ka))
+    lo = np.empty_like(ka); cnt = np.empty_like(ka)
+    ii, jj = [], []
+    for ox in (-1, 0, 1):
+        for oy in (-1, 0, 1):
+            nk = qk + (ox << 32) + oy
+            lo[qa] = np.searchsorted(sk, nk, "left")
+            cnt[qa] = np.searchsorted(sk, nk, "right")
+            cnt -= lo
+            total = int(cnt.sum())
+            if total == 0: continue
+            starts = np.repeat(lo - (np.cumsum(cnt) - cnt), cnt)
+            ii.append(np.repeat(idx, cnt)); jj.append(order[starts + np.arange(total)])
+    if not ii: return idx[:0], idx[:0]
+    return np.concatenate(ii), np.concatenate(jj)
+
+def numpy_rng(rng):
+    """A NumPy generator seeded from `rng`, so a seeded GameState stays reproducible."""
+    return np.random.default_rng(rng.getrandbits(64))
+
+def arena_extent():
+    """Half-width of the area the cat, fish and dogs move in."""
+    return grid_half_cells() * CELL_SIZE
+
+def dog_separation():
+    """Distance dogs are pushed apart to; also the dog broadphase cell size."""
+    return DOG_RADIUS * 2.5
+
+
+class GameClock:
+    """The one time source: sim time `now`, frame_dt() and the deadline heap."""
+    def __init__(self, mode="virtual", scale=1.0):
+        self.mode = mode
+        self.scale = scale
+        self.now = 0.0
+        self.paused = False
+        self.wall_dt = 0.0
+        self._last_wall = None
+        self._deadlines = []  # min-heap of (when, seq, fire, args)
+        self._seq = itertools.count()  # ties fire in scheduling order
+
+    def schedule(self, when, fire, *args):
+        """fire(*args) is called by the first advance() that reaches `when`."""
+        # never cancelled: fire checks that what it ends is still current
+        heapq.heappush(self._deadlines, (when, next(self._seq), fire, args))
+
+    def pending(self): return len(self._deadlines)
+
+    def advance(self, dt):
+        self.now += dt
+        heap, now = self._deadlines, self.now
+        while heap and heap[0][0] <= now:
+            _, _, fire, args = heapq.heappop(heap)
+            fire(*args)
+
+    def restart_wall(self):
+        """The next frame_dt() starts timing from now (e.g. after sleeping or a pause)."""
+        self._last_wall = None
+
+    def frame_dt(self):
+        if self.mode == "virtual": return 0.0
+        wall = time.perf_counter()
+        last, self._last_wall = self._last_wall, wall
+        # a stalled frame (debugger, window drag) drops its backlog
+        self.wall_dt = 0.0 if last is None else min(MAX_FRAME_DT, wall - last)
+        if self.paused: return 0.0
+        return self.wall_dt * (self.scale if self.mode == "scaled" else 1.0)
+
+
+class World:
+    """Time of day and weather, both driven by clock deadlines."""
+    WEATHER_ROLL_SEC = 20.0
+
+    def __init__(self, clock, rng=random):
+        self.clock = clock
+        self.rng = rng
+        self.phase = "AM"
+        self._start = clock.now
+        self.weather = "clear"
+        self._last_roll = clock.now
+        clock.schedule(self._start + TIME_OF_DAY_DURATION_SEC, self._phase_due)
+        clock.schedule(self._last_roll + self.WEATHER_ROLL_SEC, self._roll_due)
+
+    def _phase_due(self):
+        now = self.clock.now
+        n = (now - self._start) // TIME_OF_DAY_DURATION_SEC
+        self.phase = ("AM", "PM", "EVE")[int(n % 3)]
+        nxt = self._start + (n + 1) * TIME_OF_DAY_DURATION_SEC
+        # rounding can land a hair short of the boundary; look again next tick
+        self.clock.schedule(nxt if nxt > now else math.nextafter(now, math.inf), self._phase_due)
+
+    def _roll_due(self):
+        now = self.clock.now
+        if now - self._last_roll > self.WEATHER_ROLL_SEC:
+            self._last_roll = now
+            if self.rng.random() < 0.25:
+                self.weather = self.rng.choice(["clear", "fog", "rain"])
+            self.clock.schedule(now + self.WEATHER_ROLL_SEC, self._roll_due)
+        else:  # exactly on the deadline: a roll needs strictly more time
+            self.clock.schedule(math.nextafter(now, math.inf), self._roll_due)
+
+class Cat:
+    def __init__(self):
+        self.x = 0.0; self.y = 0.0; self.yaw_deg = 0.0
+        self.base_z = CAT_Z_OFFSET; self.jump_t = -1.0; self.jump_cd = 0.0
+        self.step_mult = 1.0
+        self.max_extent = arena_extent()
+        self.snapshot()
+
+    def snapshot(self):
+        # pose at the start of the tick, for render interpolation
+        self.prev_x, self.prev_y, self.prev_z = self.x, self.y, self.current_z()
+
+    def rotate_left(self):  self.yaw_deg = (self.yaw_deg + 90.0) % 360.0
+    def rotate_right(self): self.yaw_deg = (self.yaw_deg - 90.0) % 360.0
+    def move_forward(self):
+        step = CELL_SIZE * self.step_mult; yaw = radians(self.yaw_deg)
+        self._try_move(self.x + math.cos(yaw) * step, self.y + math.sin(yaw) * step)
+    def move_backward(self):
+        step = CELL_SIZE * self.step_mult; yaw = radians(self.yaw_deg)
+        self._try_move(self.x - math.cos(yaw) * step, self.y - math.sin(yaw) * step)
+    def start_jump(self):
+        if self.jump_t < 0 and self.jump_cd <= 0: self.jump_t = 0.0
+    def update(self, dt):
+        if self.jump_cd > 0: self.jump_cd = max(0.0, self.jump_cd - dt)
+        if self.jump_t >= 0.0:
+            self.jump_t += dt / max(1e-6, CAT_JUMP_DURATION)
+            if self.jump_t >= 1.0: self.jump_t = -1.0; self.jump_cd = CAT_JUMP_COOLDOWN
+    def current_z(self):
+        if self.jump_t < 0: return self.base_z
+        t = self.jump_t
+        return self.base_z + 4.0 * CAT_JUMP_HEIGHT * t * (1.0 - t)
+    def _try_move(self, nx, ny):
+        nx = max(-self.max_extent, min(self.max_extent, nx))
+        ny = max(-self.max_extent, min(self.max_extent, ny))
+        self.x, self.y = nx, ny
+
+
+class Fish:
+    def __init__(self, x, y, kind="normal", now=0.0, rng=random):
+        self.x, self.y = x, y
+        self.prev_x, self.prev_y = x, y
+        self.z = FISH_Z
+        self.kind = kind
+        self.alive = True
+        self.tail_angle = 0
+        self.timer = None
+        self.vx = 0.0; self.vy = 0.0
+        self.size = 1.0
+        self.color = (0.20, 0.75, 0.95)
+        if kind == "fast":
+            ang = rng.uniform(0, 2 * math.pi)
+            self.vx = math.cos(ang) * FISH_FAST_SPEED
+            self.vy = math.sin(ang) * FISH_FAST_SPEED
+        elif kind == "gold":
+            self.color = (1.0, 0.84, 0.0); self.size = 1.8
+
+        else:
+            self.color = (0.20, 0.75, 0.95); self.size = 1.0
+        self.die_at = now + rng.uniform(*FISH_TIMED_TTL_S) if kind == "timed" else 1e12
+
+    def activate_powerup(self):
+        if random.choice([True, False]): print("Fish activated: Speed boost!")
+        else: print("Fish activated: Double score!")
+
+    def update(self, dt, extent):
+        if not self.alive: return
+        self.prev_x, self.prev_y = self.x, self.y
+        self.tail_angle = (self.tail_angle + FISH_TAIL_SWING_DEG_S * dt) % 360
+        if self.kind in ("fast", "gold"):
+            self.x += self.vx * dt; self.y += self.vy * dt
+            if self.x < -extent or self.x > extent:
+                self.vx *= -1; self.x = max(-extent, min(extent, self.x))
+            if self.y < -extent or self.y > extent:
+                self.vy *= -1; self.y = max(-extent, min(extent, self.y))
+
+class FishField:
+    """Fish plus a spatial hash with one bucket of live fish per floor cell."""
+    def __init__(self, clock, rng=random):
+        self.clock = clock
+        self.rng = rng
+        self.extent = arena_extent()
+        self.cell_lim = grid_half_cells() + 1
+        self.fishes = []
+        self.buckets = {}
+        self.alive_count = 0
+        self.wave = 0  # bumped per spawn_random, so older expiry deadlines are ignored
+    def _rand_kind(self):
+        r = self.rng.random()
+        if r < FISH_PROB_GOLD: return "gold"
+        if r < FISH_PROB_FAST: return "fast"
+        if r < FISH_PROB_TIMED: return "timed"
+        return "normal"
+    def _cell(self, x, y):
+        return (math.floor(x / CELL_SIZE), math.floor(y / CELL_SIZE))
+    def _insert(self, f):
+        f.cell = self._cell(f.x, f.y)
+        self.buckets.setdefault(f.cell, set()).add(f)
+    def _remove(self, f):
+        b = self.buckets[f.cell]
+        b.discard(f)
+        if not b: del self.buckets[f.cell]
+    def _rebucket(self, f):
+        cell = self._cell(f.x, f.y)
+        if cell != f.cell:
+            self._remove(f)
+            f.cell = cell
+            self.buckets.setdefault(cell, set()).add(f)
+    def _kill(self, f):
+        f.alive = False
+        self._remove(f)
+        self.alive_count -= 1
+    def _near(self, px, py, r):
+        # live fish in every bucket the query circle's bounding box touches
+        lim = self.cell_lim
+        x0, y0 = self._cell(px - r, py - r)
+        x1, y1 = self._cell(px + r, py + r)
+        found = []
+        for ix in range(max(x0, -lim), min(x1, lim) + 1):
+            for iy in range(max(y0, -lim), min(y1, lim) + 1):
+                b = self.buckets.get((ix, iy))
+                if b: found.extend(b)
+        return found
+    def spawn_random(self, n=None):
+        if n is None: n = FISH_COUNT
+        self.fishes.clear(); self.buckets.clear()
+        self.wave += 1
+        extent = self.extent
+        now, rng = self.clock.now, self.rng
+        for _ in range(n):
+            x = rng.uniform(-extent, extent); y = rng.uniform(-extent, extent)
+            f = Fish(x, y, self._rand_kind(), now, rng)
+            self.fishes.append(f); self._insert(f)
+            if f.kind == "timed": self.clock.schedule(f.die_at, self._expire, f, self.wave)
+        self.alive_count = n
+    def _expire(self, f, wave):
+        if wave == self.wave and f.alive:
+            print(f"Timed fish expired at ({f.x}, {f.y})")
+            self._kill(f)
+    def update(self, dt):
+        extent = self.extent
+        for f in self.fishes:
+            if not f.alive: continue
+            f.update(dt, extent)
+            if f.kind in ("fast", "gold"):
+                self._rebucket(f)
+    def collect_if_close(self, px, py, r):
+        got = 0; r2 = r * r
+        for f in self._near(px, py, r):
+            dx, dy = f.x - px, f.y - py
+            if dx * dx + dy * dy <= r2:
+                self._kill(f); got += 1
+        return got
+    def collect_if_close_any(self, xs, ys, r):
+        return sum(self.collect_if_close(px, py, r) for px, py in zip(xs, ys))
+    def collect_and_report(self, px, py, r):
+        kinds = {"normal": 0, "fast": 0, "timed": 0, "gold": 0}
+        r2 = r * r
+        for f in self._near(px, py, r):
+            dx, dy = f.x - px, f.y - py
+            if dx * dx + dy * dy <= r2:
+                self._kill(f); kinds[f.kind] += 1
+        return kinds
+    def remaining(self): return self.alive_count
+    def magnet_pull(self, px, py, radius, pull_speed, dt):
+        r2 = radius * radius
+        for f in self._near(px, py, radius):
+            dx = px - f.x; dy = py - f.y
+            d2 = dx * dx + dy * dy
+            if 1e-9 < d2 <= r2:
+                d = d2 ** 0.5
+                strength = 1.0 - (d / radius)
+                step = pull_speed * strength * dt
+                if step > d: step = d
+                ux, uy = dx / d, dy / d
+                f.x += ux * step; f.y += uy * step
+                self._rebucket(f)
+
+class ArrayFishField:
+    """Struct-of-arrays FishField with vectorized updates; kind indexes FISH_KINDS."""
+    def __init__(self, clock, rng=random):
+        self.clock = clock
+        self.rng = numpy_rng(rng)
+        self.extent = arena_extent()
+        self.wave = 0
+        self._alloc(0)
+
+    def _alloc(self, n):
+        self.x = np.zeros(n); self.y = np.zeros(n)
+        self.prev_x = np.zeros(n); self.prev_y = np.zeros(n)
+        self.vx = np.zeros(n); self.vy = np.zeros(n)
+        self.kind = np.zeros(n, np.int8)
+        self.alive = np.zeros(n, bool)
+        self.die_at = np.full(n, 1e12)
+        self.tail_angle = np.zeros(n)
+
+    def spawn_random(self, n=None):
+        if n is None: n = FISH_COUNT
+        self._alloc(n)
+        extent, rng = self.extent, self.rng
+        self.x[:] = rng.uniform(-extent, extent, n); self.y[:] = rng.uniform(-extent, extent, n)
+        self.prev_x[:] = self.x; self.prev_y[:] = self.y
+        # same cumulative thresholds as FishField._rand_kind
+        r = rng.random(n)
+        self.kind[:] = np.select([r < FISH_PROB_GOLD, r < FISH_PROB_FAST, r < FISH_PROB_TIMED],
+                                 [3, 1, 2], 0)
+        fast = self.kind == 1
+        ang = rng.uniform(0, 2 * math.pi, int(fast.sum()))
+        self.vx[fast] = np.cos(ang) * FISH_FAST_SPEED; self.vy[fast] = np.sin(ang) * FISH_FAST_SPEED
+        timed = np.flatnonzero(self.kind == 2)
+        self.die_at[timed] = self.clock.now + rng.uniform(*FISH_TIMED_TTL_S, len(timed))
+        self.alive[:] = True
+        self.wave += 1
+        for i, t in zip(timed.tolist(), self.die_at[timed].tolist()):
+            self.clock.schedule(t, self._expire, i, self.wave)
+
+    def _expire(self, i, wave):
+        if wave == self.wave and self.alive[i]:
+            print(f"Timed fish expired at ({self.x[i]}, {self.y[i]})")
+            self.alive[i] = False
+
+    def update(self, dt):
+        extent = self.extent
+        alive = self.alive
+        self.prev_x[:] = self.x; self.prev_y[:] = self.y
+        self.tail_angle[alive] = (self.tail_angle[alive] + FISH_TAIL_SWING_DEG_S * dt) % 360
+        moving = alive & ((self.kind == 1) | (self.kind == 3))
+        self.x[moving] += self.vx[moving] * dt; self.y[moving] += self.vy[moving] * dt
+        for p, v in ((self.x, self.vx), (self.y, self.vy)):
+            out = moving & (np.abs(p) > extent)
+            v[out] *= -1; np.clip(p, -extent, extent, out=p)
+
+    def _hits(self, px, py, r):
+        return self.alive & ((self.x - px) ** 2 + (self.y - py) ** 2 <= r * r)
+
+    def collect_if_close(self, px, py, r):
+        hit = self._hits(px, py, r)
+        self.alive &= ~hit
+        return int(hit.sum())
+
+    def collect_if_close_any(self, xs, ys, r):
+        """Removes the fish within r of any point (xs[k], ys[k]); returns how many."""
+        live = np.flatnonzero(self.alive)
+        if len(live) == 0 or len(xs) == 0: return 0
+        i, j = _cell_pairs(self.x[live], self.y[live], xs, ys, r)
+        i = live[i]
+        hit = i[(self.x[i] - xs[j]) ** 2 + (self.y[i] - ys[j]) ** 2 <= r * r]
+        hit = np.unique(hit)
+        self.alive[hit] = False
+        return len(hit)
+
+    def collect_and_report(self, px, py, r):
+        hit = self._hits(px, py, r)
+        self.alive &= ~hit
+        counts = np.bincount(self.kind[hit], minlength=len(FISH_KINDS))
+        return {k: int(c) for k, c in zip(FISH_KINDS, counts)}
+
+    def remaining(self): return int(self.alive.sum())
+
+    def magnet_pull(self, px, py, radius, pull_speed, dt):
+        dx = px - self.x; dy = py - self.y
+        d2 = dx * dx + dy * dy
+        m = self.alive & (d2 > 1e-9) & (d2 <= radius * radius)
+        if not m.any(): return
+        d = np.sqrt(d2[m])
+        step = np.minimum(pull_speed * (1.0 - d / radius) * dt, d)
+        self.x[m] += dx[m] / d * step; self.y[m] += dy[m] / d * step
+
+def make_fish_field(clock, rng=random):
+    return ArrayFishField(clock, rng) if FISH_BACKEND == "numpy" else FishField(clock, rng)
+
+class FlowField:
+    """Windowed, LRU-cached flow fields that steer dogs around ARENA_OBSTACLES."""
+    STEPS = ((1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+             (1, 1, math.sqrt(2)), (1, -1, math.sqrt(2)), (-1, 1, math.sqrt(2)), (-1, -1, math.sqrt(2)))
+    def __init__(self, obstacles=None):
+        if obstacles is None: obstacles = ARENA_OBSTACLES
+        self.half = grid_half_cells()
+        self.window = FLOW_WINDOW_HALF_CELLS
+        n = 2 * self.half + 1
+        self.blocked = np.zeros((n, n), bool)
+        for ix, iy in obstacles:
+            if -self.half <= ix <= self.half and -self.half <= iy <= self.half:
+                self.blocked[ix + self.half, iy + self.half] = True
+        self.open = not self.blocked.any()
+        # target cell -> (i0, j0, unreachable, waypoint_x, waypoint_y, clear); the
+        # grids cover the window whose first cell is grid index (i0, j0), and
+        # clear (1/0, -1 not worked out yet) is filled in as dogs visit cells
+        self.cache = OrderedDict()
+    def _index(self, v):
+        return min(2 * self.half, max(0, math.floor(v / CELL_SIZE) + self.half))
+    def _indices(self, v):
+        return np.clip(np.floor(v / CELL_SIZE).astype(np.int64) + self.half, 0, 2 * self.half)
+    def _build(self, tc):
+        n, w, half = 2 * self.half + 1, self.window, self.half
+        i0, j0 = max(0, tc[0] - w), max(0, tc[1] - w)
+        blocked = self.blocked[i0:tc[0] + w + 1, j0:tc[1] + w + 1]
+        ni, nj = blocked.shape
+        tc = (tc[0] - i0, tc[1] - j0)
+        dist = np.full((ni, nj), np.inf)
+        dist[tc] = 0.0
+        heap = [(0.0, tc)]
+        while heap:
+            d, (i, j) = heapq.heappop(heap)
+            if d > dist[i, j]: continue
+            for di, dj, cost in self.STEPS:
+                a, b = i + di, j + dj
+                if not (0 <= a < ni and 0 <= b < nj) or blocked[a, b]: continue
+                if di and dj and (blocked[i + di, j] or blocked[i, j + dj]): continue
+                if d + cost < dist[a, b]:
+                    dist[a, b] = d + cost
+                    heapq.heappush(heap, (d + cost, (a, b)))
+        cx = (np.arange(i0, i0 + ni) - half + 0.5) * CELL_SIZE
+        cy = (np.arange(j0, j0 + nj) - half + 0.5) * CELL_SIZE
+        wx = np.repeat(cx[:, None], nj, 1); wy = np.repeat(cy[None, :], ni, 0)
+        # each cell's waypoint: the first of STEPS reaching the lowest distance
+        best = dist.copy()
+        pad_d = np.pad(dist, 1, constant_values=np.inf)
+        pad_b = np.pad(blocked, 1, constant_values=True)
+        pad_x = np.pad(wx, 1); pad_y = np.pad(wy, 1)
+        for di, dj, _ in self.STEPS:
+            shifted = (slice(1 + di, 1 + di + ni), slice(1 + dj, 1 + dj + nj))
+            nd = pad_d[shifted]
+            better = nd < best
+            if di and dj:
+                better &= ~pad_b[1 + di:1 + di + ni, 1:1 + nj] & ~pad_b[1:1 + ni, 1 + dj:1 + dj + nj]
+            best[better] = nd[better]
+            wx[better] = pad_x[shifted][better]; wy[better] = pad_y[shifted][better]
+        return i0, j0, np.isinf(dist), wx, wy, np.full((ni, nj), -1, np.int8)
+    def _field(self, tx, ty):
+        tc = (self._index(tx), self._index(ty))
+        cache = self.cache
+        f = cache.get(tc)
+        if f is None:
+            f = cache[tc] = self._build(tc)
+            while len(cache) > FLOW_CACHE_FIELDS: cache.popitem(last=False)
+        else:
+            cache.move_to_end(tc)
+        return f
+    def _cells_clear(self, gi, gj, tc):
+        """True for grid cells (gi, gj) from which a dog can go straight into target cell tc."""
+        s, r, half = CELL_SIZE, DOG_RADIUS, self.half
+        x0 = (gi - half) * s; y0 = (gj - half) * s
+        vx = (tc[0] - gi) * s; vy = (tc[1] - gj) * s
+        t = np.linspace(0.0, 1.0, int(np.hypot(vx, vy).max(initial=0.0) * 4 / s) + 2)
+        # nine parallel lines between the cells grown by DOG_RADIUS, sampled every
+        # quarter cell, are closer together than a blocked cell is wide
+        clear = np.ones(len(gi), bool)
+        for ox in (-r, s * 0.5, s + r):
+            for oy in (-r, s * 0.5, s + r):
+                px = (x0 + ox)[:, None] + vx[:, None] * t
+                py = (y0 + oy)[:, None] + vy[:, None] * t
+                clear &= ~self.blocked[self._indices(px), self._indices(py)].any(axis=1)
+        return clear
+    def steer_point(self, x, y, target):
+        """Where a dog at (x, y) should head to reach target."""
+        if self.open: return target
+        wx, wy = self.steer_points(np.array([x]), np.array([y]), target)
+        return (float(wx[0]), float(wy[0]))
+    def steer_points(self, xs, ys, target):
+        """Vectorized steer_point: arrays of waypoint x and y."""
+        tx, ty = target
+        wx, wy = np.full(len(xs), float(tx)), np.full(len(ys), float(ty))
+        if self.open: return wx, wy
+        i0, j0, unreachable, fx, fy, clear = self._field(tx, ty)
+        i, j = self._indices(xs) - i0, self._indices(ys) - j0
+        tc = (self._index(tx), self._index(ty))
+        # dogs outside the window, in the target cell or cut off from it head
+        # straight for the target; the rest do unless their cell's view is blocked
+        k = np.flatnonzero((i >= 0) & (i < fx.shape[0]) & (j >= 0) & (j < fx.shape[1])
+                           & ((i != tc[0] - i0) | (j != tc[1] - j0)))
+        k = k[~unreachable[i[k], j[k]]]
+        c = clear[i[k], j[k]]
+        if (c < 0).any():
+            ui, uj = np.unique(np.stack((i[k][c < 0], j[k][c < 0])), axis=1)
+            clear[ui, uj] = self._cells_clear(ui + i0, uj + j0, tc)
+            c = clear[i[k], j[k]]
+        k = k[c == 0]
+        wx[k] = fx[i[k], j[k]]; wy[k] = fy[i[k], j[k]]
+        return wx, wy
+    def push_out(self, xs, ys):
+        """Moves points inside blocked cells just past the nearest free edge; returns their indices."""
+        if self.open: return np.zeros(0, np.int64)
+        i, j = self._indices(xs), self._indices(ys)
+        k = np.flatnonzero(self.blocked[i, j])
+        if not len(k): return k
+        i, j, x, y = i[k], j[k], xs[k], ys[k]
+        x0 = (i - self.half) * CELL_SIZE; y0 = (j - self.half) * CELL_SIZE
+        # distance to the left, right, bottom and top edges; inf where the
+        # cell across that edge is blocked or off the grid
+        gap = np.column_stack((x - x0, x0 + CELL_SIZE - x, y - y0, y0 + CELL_SIZE - y))
+        last = 2 * self.half
+        for side, (a, b) in enumerate(((i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1))):
+            off = (a < 0) | (a > last) | (b < 0) | (b > last)
+            off[~off] = self.blocked[a[~off], b[~off]]
+            gap[off, side] = np.inf
+        side = np.argmin(gap, axis=1)
+        ok = np.isfinite(gap[np.arange(len(k)), side])  # walled in on all sides: leave it
+        eps = 1e-3
+        xs[k[ok & (side == 0)]] = x0[ok & (side == 0)] - eps
+        xs[k[ok & (side == 1)]] = x0[ok & (side == 1)] + CELL_SIZE + eps
+        ys[k[ok & (side == 2)]] = y0[ok & (side == 2)] - eps
+        ys[k[ok & (side == 3)]] = y0[ok & (side == 3)] + CELL_SIZE + eps
+        return k[ok]
+
+class Dog:
+    def __init__(self, x, y, now=0.0, rng=random):
+        self.x, self.y = x, y
+        self.prev_x, self.prev_y = x, y
+        self.z = DOG_Z
+        self.stunned = False  # cleared by the pack when stunned_until comes due
+        self.stunned_until = 0.0
+        self.steal_ready_at = now + rng.uniform(*DOG_STEAL_INTERVAL_S)
+    def update(self, dt, target_xy):
+        self.prev_x, self.prev_y = self.x, self.y
+        if self.stunned: return
+        tx, ty = target_xy
+        dx, dy = tx - self.x, ty - self.y
+        d = math.hypot(dx, dy) + 1e-6
+        step = DOG_SPEED * dt
+        self.x += (dx / d) * step; self.y += (dy / d) * step
+
+
+class DogPack:
+    """Dogs plus a dog_separation()-cell grid for separation, stuns and contact checks."""
+    def __init__(self, clock, rng=random):
+        self.clock = clock
+        self.rng = rng
+        self.extent = arena_extent()
+        self.dogs = []
+        self.grid = None  # (ix, iy) -> [dog index]; None when stale
+        self.cell = dog_separation()  # grid cell size the current grid was built with
+        self.flow = FlowField()
+
+    def clear(self):
+        self.dogs.clear(); self.grid = None
+
+    def ensure_count(self, n):
+        while len(self.dogs) < n:
+            self.spawn_random()
+
+    def spawn_random(self):
+        extent, rng = self.extent, self.rng
+        self.dogs.append(Dog(rng.uniform(-extent, extent),
+                             rng.uniform(-extent, extent), self.clock.now, rng))
+        self.grid = None
+
+    def _cell(self, x, y):
+        cell = self.cell
+        return (math.floor(x / cell), math.floor(y / cell))
+
+    def rebuild_grid(self):
+        self.cell = dog_separation()
+        grid = {}
+        for i, d in enumerate(self.dogs):
+            grid.setdefault(self._cell(d.x, d.y), []).append(i)
+        self.grid = grid
+
+    def near(self, px, py, r):
+        """Dogs within r of (px, py)."""
+        if self.grid is None: self.rebuild_grid()
+        x0, y0 = self._cell(px - r, py - r)
+        x1, y1 = self._cell(px + r, py + r)
+        r2 = r * r
+        found = []
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self.grid):
+            cells = [c for c in self.grid if x0 <= c[0] <= x1 and y0 <= c[1] <= y1]
+        else:
+            cells = [(ix, iy) for ix in range(x0, x1 + 1) for iy in range(y0, y1 + 1)]
+        for c in cells:
+            for i in self.grid.get(c, ()):
+                d = self.dogs[i]
+                if (d.x - px) ** 2 + (d.y - py) ** 2 <= r2: found.append(d)
+        return found
+
+    def stun_within(self, px, py, r, until):
+        hit = self.near(px, py, r)
+        for d in hit:
+            d.stunned = True; d.stunned_until = until
+        if hit: self.clock.schedule(until, self._stun_over, hit)
+
+    def _stun_over(self, dogs):
+        now = self.clock.now
+        for d in dogs:
+            if d.stunned_until <= now: d.stunned = False  # else re-stunned since
+
+    def contacts(self, px, py, pz, r):
+        """Number of dogs touching a body of radius r centred at (px, py, pz)."""
+        return sum(1 for d in self.near(px, py, r) if abs(pz - d.z) <= COLLISION_HEIGHT_TOL)
+
+    def steal(self, fish_field):
+        """Dogs whose steal timer ran out grab fish under them; returns how many."""
+        now = self.clock.now
+        stolen = 0
+        for d in self.dogs:
+            if now >= d.steal_ready_at:
+                stolen += fish_field.collect_if_close(d.x, d.y, FISH_PICKUP_RADIUS * DOG_STEAL_RADIUS_MULT)
+                d.steal_ready_at = now + self.rng.uniform(*DOG_STEAL_INTERVAL_S)
+        return stolen
+
+    def update(self, dt, target):
+        dogs, flow = self.dogs, self.flow
+        if flow.open:
+            for d in dogs: d.update(dt, target)
+        else:
+            wx, wy = flow.steer_points(np.array([d.x for d in dogs]), np.array([d.y for d in dogs]), target)
+            for d, x, y in zip(dogs, wx.tolist(), wy.tolist()): d.update(dt, (x, y))
+        self.rebuild_grid()
+
+    def separate(self, dt):
+        """Push dogs apart so they don't overlap visually."""
+        min_dist = dog_separation()
+        r2 = min_dist * min_dist
+        push = DOG_SPEED * 0.8 * dt
+        if self.grid is None: self.rebuild_grid()
+        grid, dogs = self.grid, self.dogs
+        # candidates come from the 3x3 cells around each dog. A pushed dog is
+        # moved to its new cell at once and a moved `a` refetches its
+        # candidates, so walking i in order with sorted candidates gives the
+        # same pushes as a full pairwise loop.
+        cell_of = [None] * len(dogs)
+        for c, members in grid.items():
+            for k in members: cell_of[k] = c
+        around = {}  # cell -> sorted dogs in its 3x3 block
+
+        def candidates(c):
+            others = around.get(c)
+            if others is None:
+                others = sorted(j for ox in (-1, 0, 1) for oy in (-1, 0, 1)
+                                for j in grid.get((c[0] + ox, c[1] + oy), ()))
+                around[c] = others
+            return others
+
+        size, floor = self.cell, math.floor
+
+        def move(k, c):
+            old = cell_of[k]
+            grid[old].remove(k)
+            if not grid[old]: del grid[old]
+            grid.setdefault(c, []).append(k)
+            cell_of[k] = c
+            for cc in (old, c):
+                for ox in (-1, 0, 1):
+                    for oy in (-1, 0, 1):
+                        around.pop((cc[0] + ox, cc[1] + oy), None)
+
+        for i, a in enumerate(dogs):
+            others = candidates(cell_of[i])
+            n = bisect_right(others, i)
+            while n < len(others):
+                j = others[n]; n += 1
+                b = dogs[j]
+                dx, dy = b.x - a.x, b.y - a.y
+                d2 = dx * dx + dy * dy
+                if 1e-9 < d2 < r2:
+                    d = math.sqrt(d2)
+                    ux, uy = dx / d, dy / d
+                    a.x -= ux * push; a.y -= uy * push
+                    b.x += ux * push; b.y += uy * push
+                    c = (floor(b.x / size), floor(b.y / size))
+                    if c != cell_of[j]: move(j, c)
+                    c = (floor(a.x / size), floor(a.y / size))
+                    if c != cell_of[i]:
+                        move(i, c)
+                        others = candidates(c)
+                        n = bisect_right(others, j)
+        if not self.flow.open:
+            xs = np.array([d.x for d in dogs]); ys = np.array([d.y for d in dogs])
+            for k in self.flow.push_out(xs, ys).tolist():
+                dogs[k].x, dogs[k].y = float(xs[k]), float(ys[k])
+        self.rebuild_grid()
+
+
+class ArrayDogPack:
+    """Struct-of-arrays DogPack; chasing, separation and steals are vectorized."""
+    def __init__(self, clock, rng=random):
+        self.clock = clock
+        self.rng = numpy_rng(rng)
+        self.extent = arena_extent()
+        self.flow = FlowField()
+        self.clear()
+
+    def clear(self):
+        self.x = np.zeros(0); self.y = np.zeros(0)
+        self.prev_x = np.zeros(0); self.prev_y = np.zeros(0)
+        self.stunned = np.zeros(0, bool)  # cleared when stunned_until comes due
+        self.stunned_until = np.zeros(0)
+        self.steal_ready_at = np.zeros(0)
+
+    def __len__(self): return len(self.x)
+
+    def ensure_count(self, n):
+        k = n - len(self.x)
+        if k <= 0: return
+        extent, rng, now = self.extent, self.rng, self.clock.now
+        x = rng.uniform(-extent, extent, k); y = rng.uniform(-extent, extent, k)
+        self.x = np.concatenate((self.x, x)); self.y = np.concatenate((self.y, y))
+        self.prev_x = np.concatenate((self.prev_x, x)); self.prev_y = np.concatenate((self.prev_y, y))
+        self.stunned = np.concatenate((self.stunned, np.zeros(k, bool)))
+        self.stunned_until = np.concatenate((self.stunned_until, np.zeros(k)))
+        self.steal_ready_at = np.concatenate((self.steal_ready_at, now + rng.uniform(*DOG_STEAL_INTERVAL_S, k)))
+
+    def _within(self, px, py, r):
+        return (self.x - px) ** 2 + (self.y - py) ** 2 <= r * r
+
+    def stun_within(self, px, py, r, until):
+        hit = self._within(px, py, r)
+        if not hit.any(): return
+        self.stunned[hit] = True; self.stunned_until[hit] = until
+        self.clock.schedule(until, self._stun_over)
+
+    def _stun_over(self):
+        self.stunned &= self.clock.now < self.stunned_until
+
+    def contacts(self, px, py, pz, r):
+        if abs(pz - DOG_Z) > COLLISION_HEIGHT_TOL: return 0
+        return int(self._within(px, py, r).sum())
+
+    def steal(self, fish_field):
+        now = self.clock.now
+        ready = np.flatnonzero(now >= self.steal_ready_at)
+        stolen = fish_field.collect_if_close_any(self.x[ready], self.y[ready],
+                                                 FISH_PICKUP_RADIUS * DOG_STEAL_RADIUS_MULT)
+        self.steal_ready_at[ready] = now + self.rng.uniform(*DOG_STEAL_INTERVAL_S, len(ready))
+        return stolen
+
+    def update(self, dt, target):
+        self.prev_x[:] = self.x; self.prev_y[:] = self.y
+        tx, ty = self.flow.steer_points(self.x, self.y, target)
+        dx = tx - self.x; dy = ty - self.y
+        step = np.where(self.stunned, 0.0, DOG_SPEED * dt) / (np.hypot(dx, dy) + 1e-6)
+        self.x += dx * step; self.y += dy * step
+
+    def _pairs(self):
+        """Index pairs (i < j) of dogs in the same or adjacent dog_separation() cells."""
+        i, j = _cell_pairs(self.x, self.y, self.x, self.y, dog_separation())
+        keep = i < j
+        return i[keep], j[keep]
+
+    def separate(self, dt):
+        """Push overlapping dogs apart, summing every pair's push before applying it."""
+        min_dist = dog_separation()
+        push = DOG_SPEED * 0.8 * dt
+        i, j = self._pairs()
+        dx = self.x[j] - self.x[i]; dy = self.y[j] - self.y[i]
+        d2 = dx * dx + dy * dy
+        m = (d2 > 1e-9) & (d2 < min_dist * min_dist)
+        i, j, dx, dy = i[m], j[m], dx[m], dy[m]
+        k = push / np.sqrt(d2[m])
+        fx, fy = dx * k, dy * k
+        np.add.at(self.x, i, -fx); np.add.at(self.y, i, -fy)
+        np.add.at(self.x, j, fx); np.add.at(self.y, j, fy)
+        self.flow.push_out(self.x, self.y)
+
+def make_dog_pack(clock, rng=random):
+    return ArrayDogPack(clock, rng) if DOG_BACKEND == "numpy" else DogPack(clock, rng)
+
+
+class GameState:
+    """Everything a round needs, advanced by step(dt, inputs); a seeded round replays exactly."""
+    def __init__(self, clock=None, profiler=None, seed=None):
+        self.clock = clock or GameClock()
+        self.profiler = profiler or Profiler(enabled=False)
+        self.seed = random.randrange(1 << 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.world = World(self.clock, self.rng)
+        self.cat = Cat()
+        self.fish_field = make_fish_field(self.clock, self.rng)
+        self.dogs = make_dog_pack(self.clock, self.rng)
+        self.cheat_mode = False
+        # (name, x, y) notifications for the frontend, e.g. to spawn effects;
+        # only the newest are kept, so a headless run never drains it
+        self.events = deque(maxlen=64)
+        self.ticks = 0  # step() calls so far
+        self.recorder = None
+        self.reset()
+
+    def reset(self):
+        self.score = 0; self.lives = START_LIVES; self.game_over = False
+        self.last_meow_at = -1e9; self.double_score_until = -1e9; self.speed_boost_until = -1e9
+        self.score_x10_until = -1e9  # 10× score power-up timer
+        self._powerups_due()
+        self.fish_stolen = 0  # fish the dogs took this round
+        self.last_damage_time = -1e9; self.decoy = None  # {"x","y","expires"}
+        self.fish_field.spawn_random()
+        self.dogs.clear(); self.dogs.ensure_count(DOG_COUNT)
+        self.cat.x = 0.0; self.cat.y = 0.0; self.cat.yaw_deg = 0.0
+
+    def meow_ready(self): return (self.clock.now - self.last_meow_at) >= MEOW_COOLDOWN_S
+
+    def meow_cooldown_left(self): return max(0.0, MEOW_COOLDOWN_S - (self.clock.now - self.last_meow_at))
+
+    def decoy_active(self): return self.decoy is not None  # cleared when it expires
+
+    def do_meow(self):
+        if not self.meow_ready(): return
+        now = self.clock.now
+        self.last_meow_at = now
+        cat = self.cat
+        self.events.append(("meow", cat.x, cat.y))
+        self.dogs.stun_within(cat.x, cat.y, MEOW_RANGE, now + MEOW_STUN_SEC)
+
+    def drop_decoy(self):
+        self.decoy = decoy = {"x": self.cat.x, "y": self.cat.y, "expires": self.clock.now + DECOY_LIFETIME}
+        self.clock.schedule(decoy["expires"], self._decoy_due, decoy)
+        self.events.append(("decoy", self.cat.x, self.cat.y))
+
+    def _decoy_due(self, decoy):
+        if self.decoy is decoy: self.decoy = None
+
+    def _powerups_due(self):
+        # the score multiplier and cat speed only change when a power-up starts or ends
+        now = self.clock.now
+        self.score_mult = 10 if now < self.score_x10_until else (2 if now < self.double_score_until else 1)
+        self.cat.step_mult = POWERUP_SPEED_MULT if now < self.speed_boost_until else 1.0
+
+    def _powerup_started(self, until):
+        # takes effect from the next tick and is re-checked when it runs out
+        self.clock.schedule(self.clock.now, self._powerups_due)
+        self.clock.schedule(until, self._powerups_due)
+
+    def activate_double_score(self):
+        self.double_score_until = self.clock.now + POWERUP_TIME_S
+        self._powerup_started(self.double_score_until)
+
+    def activate_speed_boost(self):
+        self.speed_boost_until = self.clock.now + POWERUP_TIME_S
+        self._powerup_started(self.speed_boost_until)
+
+    def activate_score_x10(self):
+        self.score_x10_until = self.clock.now + POWERUP_TIME_S
+        self._powerup_started(self.score_x10_until)
+        print("Score x10 activated!")
+
+    def apply_input(self, action):
+        if self.game_over and action != "restart": return
+        cat = self.cat
+        if action == "forward": cat.move_forward()
+        elif action == "backward": cat.move_backward()
+        elif action == "left": cat.rotate_left()
+        elif action == "right": cat.rotate_right()
+        elif action == "jump": cat.start_jump()
+        elif action == "cheat": self.cheat_mode = not self.cheat_mode
+        elif action == "meow": self.do_meow()
+        elif action == "decoy": self.drop_decoy()  # Drop a decoy
+        elif action == "restart": self.reset()  # Reset the game
+
+    def step(self, dt, inputs=()):
+        if inputs and self.recorder is not None: self.recorder.record(self.ticks, inputs)
+        self.ticks += 1
+        self.cat.snapshot()
+        for action in inputs: self.apply_input(action)
+        if self.game_over: return
+
+        prof = self.profiler
+        # fires whatever came due: fish expiry, stun/decoy/power-up ends, weather, phase
+        with prof.section("sim.timers"): self.clock.advance(dt)
+        now = self.clock.now
+        cat, fish_field, dogs = self.cat, self.fish_field, self.dogs
+        mult = self.score_mult
+
+        with prof.section("sim.cat"): cat.update(dt)
+        with prof.section("sim.fish"): fish_field.update(dt)
+
+        decoy = self.decoy
+        target = (decoy["x"], decoy["y"]) if decoy else (cat.x, cat.y)
+        with prof.section("sim.dogs.update"):
+            dogs.ensure_count(DOG_COUNT)
+            dogs.update(dt, target)
+        with prof.section("sim.dogs.separate"): dogs.separate(dt)
+
+        with prof.section("sim.collisions"):
+            self.fish_stolen += dogs.steal(fish_field)
+            if cat.jump_t < 0.0 and dogs.contacts(cat.x, cat.y, cat.current_z(), DOG_RADIUS + CAT_BODY_R * 0.6):
+                if (now - self.last_damage_time) >= HIT_IFRAMES_SEC and self.lives > 0:
+                    self.lives -= 1; self.last_damage_time = now
+
+            pickup_r = FISH_PICKUP_RADIUS * (1.8 if cat.jump_t >= 0.0 else 1.0)
+            kinds = fish_field.collect_and_report(cat.x, cat.y, pickup_r)
+
+        if kinds["gold"] > 0:
+            for _ in range(kinds["gold"]):
+                self.activate_score_x10()
+
+        self.score += mult * (
+            kinds["normal"] * SCORE_NORMAL
+            + kinds["fast"]   * SCORE_FAST
+            + kinds["timed"]  * SCORE_TIMED
+            + kinds["gold"]   * SCORE_GOLD
+        )
+
+        if self.cheat_mode:
+            fish_field.magnet_pull(cat.x, cat.y, CHEAT_BUBBLE_RADIUS, CHEAT_MAGNET_SPEED, dt)
+
+        if fish_field.remaining() == 0: fish_field.spawn_random()
+
+        if self.lives <= 0: self.game_over = True
+
+
+class FixedStepper:
+    """Steps GameState at a fixed SIM_DT; advance() returns the render blend factor."""
+    def __init__(self, state, dt=SIM_DT):
+        self.state = state
+        self.dt = dt
+        self.acc = 0.0
+
+    def advance(self, frame_dt, inputs):
+        self.acc += max(0.0, frame_dt)
+        while self.acc >= self.dt:
+            self.state.step(self.dt, inputs)
+            inputs.clear()  # each queued action is applied exactly once
+            self.acc -= self.dt
+        return self.acc / self.dt